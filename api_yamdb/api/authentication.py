@@ -0,0 +1,166 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+USER_SNAPSHOT_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'bio', 'role',
+    'is_superuser', 'is_staff', 'is_active', 'token_version',
+)
+ROLE_CLAIM = 'role'
+TOKEN_VERSION_CLAIM = 'ver'
+
+
+def snapshot_fields(model):
+    # from_db ожидает значения в порядке полей модели.
+    return tuple(
+        field.attname for field in model._meta.concrete_fields
+        if field.attname in USER_SNAPSHOT_FIELDS
+    )
+
+
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def token_version_key(user_id):
+    return f'auth-token-version:{user_id}'
+
+
+def cache_timeout(cache, timeout):
+    """Срок хранения с учётом того, что кэш памяти процесса не общий.
+
+    `forget_user` очищает только кэш текущего процесса, поэтому для
+    локального кэша срок ограничен `AUTH_LOCAL_CACHE_TIMEOUT`: другие
+    воркеры узнают об отзыве токенов не позже чем через него.
+    """
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        return min(timeout, settings.AUTH_LOCAL_CACHE_TIMEOUT)
+    return timeout
+
+
+def forget_user(user_id):
+    caches[settings.AUTH_USER_CACHE].delete_many(
+        [user_cache_key(user_id), token_version_key(user_id)]
+    )
+
+
+def get_cached_user(user_model, user_id):
+    """Пользователь из кэша снимков или None, если его нет в базе."""
+    cache = caches[settings.AUTH_USER_CACHE]
+    key = user_cache_key(user_id)
+    fields = snapshot_fields(user_model)
+    values = cache.get(key)
+    if values is None:
+        values = user_model.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).values_list(*fields).first()
+        if values is None:
+            return None
+        cache.set(
+            key, values,
+            cache_timeout(cache, settings.AUTH_USER_CACHE_TIMEOUT),
+        )
+    return user_model.from_db(user_model.objects.db, fields, values)
+
+
+def get_token_version(user_model, user_id):
+    """Текущая версия токенов пользователя, None — пользователь неактивен."""
+    cache = caches[settings.AUTH_USER_CACHE]
+    key = token_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        row = user_model.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).values_list('token_version', 'is_active').first()
+        version = row[0] if row and row[1] else -1
+        cache.set(
+            key, version,
+            cache_timeout(cache, settings.AUTH_TOKEN_VERSION_TIMEOUT),
+        )
+    return version if version >= 0 else None
+
+
+def access_token_for(user):
+    """Access-токен с ролью и версией токенов пользователя."""
+    token = RefreshToken.for_user(user).access_token
+    token['username'] = user.username
+    token[ROLE_CLAIM] = user.role
+    token['is_staff'] = user.is_staff
+    token['is_superuser'] = user.is_superuser
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    return token
+
+
+class TokenRoleUser(TokenUser):
+    """Пользователь, собранный из утверждений токена, без обращения к базе."""
+
+    @cached_property
+    def role(self):
+        return self.token.get(ROLE_CLAIM)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса пользователя к базе.
+
+    Если `AUTH_TRUST_TOKEN_CLAIMS` включён и токен содержит роль,
+    для безопасных методов возвращается `TokenRoleUser`: достаточно
+    сверить версию токена с кэшем версий. Остальные запросы получают
+    снимок полей `USER_SNAPSHOT_FIELDS` из кэша `AUTH_USER_CACHE` на
+    `AUTH_USER_CACHE_TIMEOUT` секунд. Кэш сбрасывается при сохранении
+    или удалении пользователя, а смена роли увеличивает версию токенов.
+    """
+
+    def authenticate(self, request):
+        self.request_method = request.method
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        version = validated_token.get(TOKEN_VERSION_CLAIM)
+        if (
+            settings.AUTH_TRUST_TOKEN_CLAIMS
+            and version is not None
+            and ROLE_CLAIM in validated_token
+            and getattr(self, 'request_method', None)
+            in permissions.SAFE_METHODS
+        ):
+            current = get_token_version(self.user_model, user_id)
+            if current is None:
+                raise AuthenticationFailed(
+                    _('User is inactive'), code='user_inactive'
+                )
+            if current != version:
+                raise AuthenticationFailed(
+                    _('Token is invalid or expired'), code='token_revoked'
+                )
+            return TokenRoleUser(validated_token)
+
+        user = get_cached_user(self.user_model, user_id)
+        if user is None:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        if version is not None and version != user.token_version:
+            raise AuthenticationFailed(
+                _('Token is invalid or expired'), code='token_revoked'
+            )
+        return user
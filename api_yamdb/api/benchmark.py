@@ -0,0 +1,267 @@
+import http.client
+import json
+import math
+import random
+import threading
+import time
+from contextlib import ExitStack
+from urllib.parse import urlencode
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test import Client
+from reviews.models import ADMIN, Genre, Review, Title, User
+
+from .authentication import access_token_for
+from .middleware import QueryCollector
+
+BENCHMARK_HOST = 'testserver'
+
+
+class Scenario:
+    """Запрос к API, параметры которого выбираются из набора данных."""
+
+    def __init__(self, name, path, params=None, method='GET', data=None,
+                 auth=False):
+        self.name = name
+        self.path = path
+        self.params = params
+        self.method = method
+        self.data = data
+        self.auth = auth
+
+    def request(self, context, rng):
+        path = self.path.format(**{
+            key: rng.choice(values) for key, values in context.items()
+            if f'{{{key}}}' in self.path
+        })
+        if self.params:
+            path = f'{path}?{urlencode(self.params(context, rng))}'
+        body = self.data(rng) if self.data else None
+        return self.method, path, body
+
+
+SCENARIOS = (
+    Scenario('titles_list', '/api/v1/titles/'),
+    Scenario(
+        'titles_filter', '/api/v1/titles/',
+        params=lambda context, rng: {'genre': rng.choice(context['genre'])},
+    ),
+    Scenario('title_detail', '/api/v1/titles/{title}/'),
+    Scenario('reviews_list', '/api/v1/titles/{popular}/reviews/'),
+    Scenario(
+        'comments_list', '/api/v1/titles/{review_path}/comments/'
+    ),
+    Scenario('categories_list', '/api/v1/categories/'),
+    Scenario('genres_list', '/api/v1/genres/'),
+    Scenario(
+        'comment_create', '/api/v1/titles/{review_path}/comments/',
+        method='POST',
+        data=lambda rng: {'text': f'Комментарий {rng.random()}'},
+        auth=True,
+    ),
+)
+
+
+def scenario_context(size=100):
+    """Идентификаторы, из которых сценарии собирают адреса запросов."""
+    titles = list(Title.objects.values_list('id', flat=True)[:size])
+    popular = list(
+        Title.objects.order_by('-score_count').values_list(
+            'id', flat=True
+        )[:size]
+    )
+    reviews = [
+        f'{title}/reviews/{review}'
+        for review, title in Review.objects.filter(
+            title__in=popular
+        ).values_list('id', 'title')[:size]
+    ]
+    genres = list(Genre.objects.values_list('slug', flat=True)[:size])
+    if not (titles and reviews and genres):
+        raise ValueError('Для сценариев нужны произведения, жанры и отзывы.')
+    return {
+        'title': titles,
+        'popular': popular,
+        'review_path': reviews,
+        'genre': genres,
+    }
+
+
+def percentile(samples, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(samples)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(durations, queries, statuses, elapsed):
+    return {
+        'requests': len(durations),
+        'p50_ms': round(percentile(durations, 50) * 1000, 3),
+        'p95_ms': round(percentile(durations, 95) * 1000, 3),
+        'p99_ms': round(percentile(durations, 99) * 1000, 3),
+        'mean_ms': round(sum(durations) / len(durations) * 1000, 3),
+        'rps': round(len(durations) / elapsed, 1),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+        'errors': sum(status >= 400 for status in statuses),
+    }
+
+
+class ClientTransport:
+    """Запросы через тестовый клиент Django в текущем потоке."""
+
+    name = 'client'
+
+    def __init__(self, token):
+        self.client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.anonymous = Client()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def send(self, method, path, data, auth):
+        client = self.client if auth else self.anonymous
+        send = getattr(client, method.lower())
+        kwargs = {}
+        if data is not None:
+            kwargs = {'data': data, 'content_type': 'application/json'}
+        collector = QueryCollector()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(collector))
+            response = send(path, **kwargs)
+        return response.status_code, len(collector.queries)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class CountingApplication:
+    """WSGI-приложение, считающее SQL-запросы каждого запроса."""
+
+    def __init__(self, application):
+        self.application = application
+        self.queries = 0
+
+    def __call__(self, environ, start_response):
+        collector = QueryCollector()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(collector))
+            result = self.application(environ, start_response)
+            body = b''.join(result)
+            if hasattr(result, 'close'):
+                result.close()
+        self.queries = len(collector.queries)
+        return [body]
+
+
+class WSGITransport:
+    """Запросы по HTTP к WSGI-серверу, запущенному в соседнем потоке."""
+
+    name = 'wsgi'
+
+    def __init__(self, token):
+        self.token = token
+        self.application = CountingApplication(get_wsgi_application())
+
+    def __enter__(self):
+        self.server = make_server(
+            '127.0.0.1', 0, self.application,
+            server_class=WSGIServer, handler_class=QuietHandler,
+        )
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+        self.connection = http.client.HTTPConnection(
+            '127.0.0.1', self.server.server_port
+        )
+        return self
+
+    def __exit__(self, *exc_info):
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def send(self, method, path, data, auth):
+        headers = {'Host': BENCHMARK_HOST}
+        if auth:
+            headers['Authorization'] = f'Bearer {self.token}'
+        body = None
+        if data is not None:
+            body = json.dumps(data)
+            headers['Content-Type'] = 'application/json'
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        response.read()
+        return response.status, self.application.queries
+
+
+TRANSPORTS = {
+    transport.name: transport for transport in (ClientTransport, WSGITransport)
+}
+
+
+def benchmark_user():
+    user, _ = User.objects.get_or_create(
+        username='benchmark',
+        defaults={'email': 'benchmark@example.com', 'role': ADMIN},
+    )
+    return user
+
+
+def run(scenarios, transports, requests=200, warmup=20, seed=0):
+    """Прогоняет сценарии и возвращает метрики по транспортам."""
+    context = scenario_context()
+    token = str(access_token_for(benchmark_user()))
+    results = {}
+    for name in transports:
+        with TRANSPORTS[name](token) as transport:
+            for scenario in scenarios:
+                rng = random.Random(seed)
+                for _ in range(warmup):
+                    transport.send(*scenario.request(context, rng),
+                                   scenario.auth)
+                durations, queries, statuses = [], [], []
+                started = time.perf_counter()
+                for _ in range(requests):
+                    method, path, data = scenario.request(context, rng)
+                    begin = time.perf_counter()
+                    status, count = transport.send(
+                        method, path, data, scenario.auth
+                    )
+                    durations.append(time.perf_counter() - begin)
+                    queries.append(count)
+                    statuses.append(status)
+                results[f'{name}:{scenario.name}'] = summarize(
+                    durations, queries, statuses,
+                    time.perf_counter() - started,
+                )
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Сценарии, ставшие медленнее базовой линии больше чем на `tolerance`.
+
+    Сравниваются p95 и число SQL-запросов на запрос.
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric in ('p95_ms', 'queries_per_request'):
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f'{key}: {metric} {previous[metric]} -> {current[metric]}'
+                )
+    return regressions
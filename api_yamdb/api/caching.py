@@ -0,0 +1,94 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from .compression import compress_all
+
+HIT = 'hit'
+MISS = 'miss'
+
+
+def representation(request):
+    """Формат ответа и влияющие на него параметры Accept.
+
+    Остальные параметры типа не учитываются, чтобы произвольные
+    значения в Accept не порождали новые записи кэша.
+    """
+    renderer = request.accepted_renderer
+    media_type = request.accepted_media_type
+    result = (renderer.format,)
+    if hasattr(renderer, 'get_indent'):
+        result += (renderer.get_indent(media_type, {}),)
+    if hasattr(renderer, 'get_layout'):
+        result += (renderer.get_layout(media_type),)
+    return result
+
+
+def normalized_query(request):
+    """Параметры запроса без учёта их порядка."""
+    return sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    )
+
+
+class ResponseCache:
+    """Отрендеренные ответы на анонимные запросы чтения.
+
+    Ключ строится по адресу, отсортированным параметрам запроса,
+    представлению ответа (`representation`) и версиям
+    `ResourceVersion` ресурса: запись увеличивает версию, и старые
+    ответы больше не находятся, поэтому кэш не отдаёт устаревших
+    данных и не требует явного удаления.
+    Ответы хранятся в кэше `RESPONSE_CACHE` не дольше
+    `RESPONSE_CACHE_TIMEOUT` секунд вместе со сжатыми вариантами,
+    которые `CompressionMiddleware` отдаёт без повторного сжатия.
+    """
+
+    @property
+    def enabled(self):
+        return bool(settings.RESPONSE_CACHE)
+
+    @property
+    def cache(self):
+        return caches[settings.RESPONSE_CACHE]
+
+    def key(self, request, versions):
+        digest = hashlib.md5(repr((
+            request.scheme,
+            request.get_host(),
+            request.path,
+            normalized_query(request),
+            representation(request),
+            versions,
+        )).encode()).hexdigest()
+        return f'response:v2:{digest}'
+
+    def get(self, key):
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        content_type, content, compressed = cached
+        response = HttpResponse(content, content_type=content_type)
+        response.compressed = compressed
+        return response
+
+    def store(self, key, response):
+        def rendered(response):
+            response.compressed = compress_all(response.content)
+            self.cache.set(
+                key,
+                (
+                    response['Content-Type'], response.content,
+                    response.compressed,
+                ),
+                settings.RESPONSE_CACHE_TIMEOUT,
+            )
+
+        response.add_post_render_callback(rendered)
+
+
+response_cache = ResponseCache()
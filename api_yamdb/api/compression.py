@@ -0,0 +1,98 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+from django.conf import settings
+
+GZIP = 'gzip'
+BROTLI = 'br'
+ZSTD = 'zstd'
+
+
+def compress_gzip(content):
+    # mtime=0 — одинаковые ответы сжимаются в одинаковые байты.
+    return gzip.compress(content, compresslevel=6, mtime=0)
+
+
+def compress_brotli(content):
+    return brotli.compress(content, quality=5)
+
+
+def compress_zstd(content):
+    return zstandard.ZstdCompressor(level=3).compress(content)
+
+
+CODECS = {GZIP: compress_gzip}
+if brotli is not None:
+    CODECS[BROTLI] = compress_brotli
+if zstandard is not None:
+    CODECS[ZSTD] = compress_zstd
+
+
+def available_encodings():
+    """Установленные кодировки `COMPRESSION_ENCODINGS` по предпочтению."""
+    return tuple(
+        encoding for encoding in settings.COMPRESSION_ENCODINGS
+        if encoding in CODECS
+    )
+
+
+def parse_accept_encoding(header):
+    """Словарь кодировка → q из заголовка Accept-Encoding."""
+    weights = {}
+    for item in header.split(','):
+        encoding, *params = [part.strip() for part in item.split(';')]
+        if not encoding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[encoding.lower()] = weight
+    return weights
+
+
+def choose_encoding(header, encodings=None):
+    """Кодировка с наибольшим q, при равенстве — по порядку сервера."""
+    if encodings is None:
+        encodings = available_encodings()
+    weights = parse_accept_encoding(header or '')
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(content, encoding):
+    return CODECS[encoding](content)
+
+
+def compress_all(content):
+    """Сжатые варианты ответа для хранения в кэше.
+
+    Пустой словарь, если сжатие выключено, ответ меньше
+    `COMPRESSION_MIN_SIZE` или не уменьшается при сжатии.
+    """
+    if (
+        not settings.COMPRESSION_ENABLED
+        or len(content) < settings.COMPRESSION_MIN_SIZE
+    ):
+        return {}
+    variants = {}
+    for encoding in available_encodings():
+        compressed = compress(content, encoding)
+        if len(compressed) < len(content):
+            variants[encoding] = compressed
+    return variants
@@ -1,6 +1,8 @@
 import django_filters
 from django_filters.rest_framework import filters
-from reviews.models import Title
+from reviews import catalog
+from reviews.models import GenreTitle, Title
+from reviews.search import search_titles
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -12,15 +14,29 @@ class TitleFilter(django_filters.FilterSet):
         field_name='name',
         lookup_expr='icontains'
     )
-    category = django_filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='iexact'
-    )
-    genre = django_filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='iexact'
-    )
+    category = django_filters.CharFilter(method='filter_category')
+    genre = django_filters.CharFilter(method='filter_genre')
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = '__all__'
+
+    def filter_category(self, queryset, name, value):
+        ids = catalog.categories.ids_iexact(value)
+        if not ids:
+            # Категория могла появиться в другом процессе после загрузки
+            # справочника.
+            return queryset.filter(category__slug__iexact=value)
+        return queryset.filter(category_id__in=ids)
+
+    def filter_genre(self, queryset, name, value):
+        ids = catalog.genres.ids_iexact(value)
+        if not ids:
+            return queryset.filter(genre__slug__iexact=value).distinct()
+        return queryset.filter(id__in=GenreTitle.objects.filter(
+            genre_id__in=ids
+        ).values('title_id'))
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
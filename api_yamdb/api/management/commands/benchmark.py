@@ -0,0 +1,140 @@
+import json
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+from reviews.models import Title
+from reviews.synthetic import Dataset
+
+from api.benchmark import SCENARIOS, TRANSPORTS, compare, run
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон API на синтетических данных в отдельной '
+        'тестовой базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=40000)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора данных и сценариев.',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Количество замеряемых запросов на сценарий.',
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=20,
+            help='Количество разогревочных запросов на сценарий.',
+        )
+        parser.add_argument(
+            '--transport', action='append', choices=tuple(TRANSPORTS),
+            help='client — тестовый клиент, wsgi — HTTP к WSGI-серверу. '
+                 'По умолчанию оба.',
+        )
+        parser.add_argument(
+            '--scenario', action='append',
+            choices=tuple(scenario.name for scenario in SCENARIOS),
+            help='Сценарии прогона, по умолчанию все.',
+        )
+        parser.add_argument(
+            '--output', help='Сохранить результаты в json-файл.',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='json-файл прошлого прогона для сравнения.',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый рост p95 и SQL-запросов относительно '
+                 'базовой линии.',
+        )
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Не удалять тестовую базу и переиспользовать её данные.',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests должен быть больше нуля.')
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+        scenarios = [
+            scenario for scenario in SCENARIOS
+            if not options['scenario'] or scenario.name in options['scenario']
+        ]
+        transports = options['transport'] or tuple(TRANSPORTS)
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb']
+        )
+        try:
+            self.generate(options)
+            results = run(
+                scenarios, transports, options['requests'],
+                options['warmup'], options['seed'],
+            )
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb']
+            )
+            teardown_test_environment()
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'dataset': {
+                        key: options[key] for key in (
+                            'titles', 'users', 'reviews', 'comments', 'seed'
+                        )
+                    },
+                    'results': results,
+                }, file, indent=2)
+        if baseline is not None:
+            regressions = compare(
+                results, baseline['results'], options['tolerance']
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессия относительно базовой линии:\n'
+                    + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def generate(self, options):
+        if Title.objects.exists():
+            return
+        started = time.monotonic()
+        counts = Dataset(
+            options['titles'], options['users'], options['reviews'],
+            options['comments'], seed=options['seed'],
+        ).save()
+        self.stdout.write(
+            ', '.join(
+                f'{model._meta.model_name}: {count}'
+                for model, count in counts.items()
+            ) + f' за {time.monotonic() - started:.1f} с'
+        )
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"сценарий":<28}{"p50":>9}{"p95":>9}{"p99":>9}'
+            f'{"rps":>9}{"SQL":>7}{"ошибок":>8}'
+        )
+        for key, result in results.items():
+            self.stdout.write(
+                f'{key:<28}{result["p50_ms"]:>9.2f}{result["p95_ms"]:>9.2f}'
+                f'{result["p99_ms"]:>9.2f}{result["rps"]:>9.1f}'
+                f'{result["queries_per_request"]:>7.1f}'
+                f'{result["errors"]:>8}'
+            )
@@ -0,0 +1,77 @@
+import io
+import os
+import pstats
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from api.profiling import load_metadata, make_profile_token, stored_profiles
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+class Command(BaseCommand):
+    help = 'Сводный отчёт по самым долгим функциям сохранённых профилей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir',
+            default=settings.PROFILING_DIR,
+            help='Каталог с профилями.',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=30,
+            help='Сколько функций выводить.',
+        )
+        parser.add_argument(
+            '--sort',
+            choices=SORT_KEYS,
+            default='cumulative',
+            help='Порядок функций в отчёте.',
+        )
+        parser.add_argument(
+            '--view',
+            help='Только профили запросов к представлению, '
+                 'например TitleViewSet.list.',
+        )
+        parser.add_argument(
+            '--token',
+            action='store_true',
+            help='Вывести значение заголовка X-Profile и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if options['token']:
+            self.stdout.write(make_profile_token())
+            return
+        if options['top'] < 1:
+            raise CommandError('--top должен быть больше нуля.')
+        if not os.path.isdir(options['dir']):
+            raise CommandError(f'Каталог {options["dir"]} не найден.')
+        views = defaultdict(list)
+        paths = []
+        for name in stored_profiles(options['dir']):
+            metadata = load_metadata(name)
+            view = metadata.get('view') or '-'
+            if options['view'] and view != options['view']:
+                continue
+            views[view].append(metadata.get('duration', 0))
+            paths.append(f'{name}.prof')
+        if not paths:
+            raise CommandError('Нет сохранённых профилей.')
+        self.stdout.write(f'Профилей: {len(paths)}')
+        for view, durations in sorted(
+            views.items(), key=lambda item: -sum(item[1])
+        ):
+            self.stdout.write(
+                f'{view}: {len(durations)} запросов, в среднем '
+                f'{sum(durations) / len(durations) * 1000:.1f} ms'
+            )
+        report = io.StringIO()
+        stats = pstats.Stats(*paths, stream=report)
+        stats.strip_dirs().sort_stats(options['sort'])
+        stats.print_stats(options['top'])
+        self.stdout.write(report.getvalue())
@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SEPARATOR = '\x1f'
+
+
+def view_label(view_func, method):
+    """`TitleViewSet.list` для вьюсетов, `SignupAPIView.post` для APIView."""
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return getattr(view_func, '__name__', 'unknown')
+    actions = getattr(view_func, 'actions', None)
+    if actions:
+        return f'{cls.__name__}.{actions.get(method.lower(), method.lower())}'
+    return f'{cls.__name__}.{method.lower()}'
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', '\\\\').replace('\n', '\\n')
+        .replace('"', '\\"')
+    )
+
+
+class Registry:
+    """Метрики запросов одного процесса.
+
+    Если задан `METRICS_DIR`, процесс периодически сохраняет снимок
+    в `<METRICS_DIR>/<pid>.json`, а `/metrics` суммирует снимки всех
+    процессов, например воркеров gunicorn.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations = {}
+        self.requests = {}
+        self.in_flight = {}
+        self.cache_results = {}
+        self.flushed = 0
+
+    def started(self, view):
+        with self.lock:
+            self.in_flight[view] = self.in_flight.get(view, 0) + 1
+
+    def finished(self, view, method, status, duration):
+        with self.lock:
+            self.in_flight[view] = self.in_flight.get(view, 1) - 1
+            key = SEPARATOR.join((view, method, str(status)))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.durations.setdefault(
+                view, [[0] * len(BUCKETS), 0.0, 0]
+            )
+            position = bisect_left(BUCKETS, duration)
+            if position < len(BUCKETS):
+                histogram[0][position] += 1
+            histogram[1] += duration
+            histogram[2] += 1
+        self.maybe_flush()
+
+    def cache_result(self, view, result):
+        key = SEPARATOR.join((view, result))
+        with self.lock:
+            self.cache_results[key] = self.cache_results.get(key, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'durations': {
+                    view: [list(buckets), total, count]
+                    for view, (buckets, total, count)
+                    in self.durations.items()
+                },
+                'requests': dict(self.requests),
+                'in_flight': dict(self.in_flight),
+                'cache': dict(self.cache_results),
+            }
+
+    def maybe_flush(self, force=False):
+        directory = settings.METRICS_DIR
+        now = time.monotonic()
+        if not directory or (
+            not force and now - self.flushed < settings.METRICS_FLUSH_INTERVAL
+        ):
+            return
+        self.flushed = now
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(f'{path}.tmp', path)
+
+    def collect(self):
+        """Снимки всех процессов, у завершившихся не учитываются gauges."""
+        directory = settings.METRICS_DIR
+        if not directory:
+            return [self.snapshot()]
+        self.maybe_flush(force=True)
+        snapshots = []
+        for name in os.listdir(directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                path = os.path.join(directory, name)
+                with open(path, encoding='utf-8') as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if not pid_alive(int(name[:-5])):
+                snapshot['in_flight'] = {}
+            snapshots.append(snapshot)
+        return snapshots
+
+    def merge(self):
+        """Сумма снимков всех процессов."""
+        durations, requests, in_flight, cache = {}, {}, {}, {}
+        for snapshot in self.collect():
+            for view, (buckets, total, count) in snapshot[
+                'durations'
+            ].items():
+                merged = durations.setdefault(
+                    view, [[0] * len(BUCKETS), 0.0, 0]
+                )
+                merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+                merged[1] += total
+                merged[2] += count
+            for counters, values in (
+                (requests, snapshot['requests']),
+                (in_flight, snapshot['in_flight']),
+                (cache, snapshot.get('cache', {})),
+            ):
+                for key, count in values.items():
+                    counters[key] = counters.get(key, 0) + count
+        return durations, requests, in_flight, cache
+
+    def render(self):
+        durations, requests, in_flight, cache = self.merge()
+        lines = [
+            '# HELP api_request_duration_seconds Время обработки запроса.',
+            '# TYPE api_request_duration_seconds histogram',
+        ]
+        for view, (buckets, total, count) in sorted(durations.items()):
+            label = f'view="{escape(view)}"'
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS, buckets):
+                cumulative += bucket
+                lines.append(
+                    'api_request_duration_seconds_bucket'
+                    f'{{{label},le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f'api_request_duration_seconds_bucket{{{label},le="+Inf"}} '
+                f'{count}'
+            )
+            lines.append(
+                f'api_request_duration_seconds_sum{{{label}}} {total}'
+            )
+            lines.append(
+                f'api_request_duration_seconds_count{{{label}}} {count}'
+            )
+        lines += metric_lines(
+            'api_requests_total', 'counter',
+            'Количество запросов по статусам.',
+            ('view', 'method', 'status'), requests,
+        )
+        lines += metric_lines(
+            'api_requests_in_flight', 'gauge', 'Запросы в обработке.',
+            ('view',), in_flight,
+        )
+        lines += metric_lines(
+            'api_response_cache_total', 'counter',
+            'Обращения к кэшу ответов.', ('view', 'result'), cache,
+        )
+        return '\n'.join(lines) + '\n'
+
+
+def metric_lines(name, kind, help_text, labels, values):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    for key, count in sorted(values.items()):
+        pairs = ','.join(
+            f'{label}="{escape(value)}"'
+            for label, value in zip(labels, key.split(SEPARATOR))
+        )
+        lines.append(f'{name}{{{pairs}}} {count}')
+    return lines
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+registry = Registry()
@@ -0,0 +1,254 @@
+import cProfile
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from .compression import choose_encoding, compress
+from .metrics import registry, view_label
+from .profiling import has_profile_token, save_profile
+
+logger = logging.getLogger('api.performance')
+
+
+class QueryCollector:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((time.perf_counter() - started, sql))
+
+    @property
+    def duration(self):
+        return sum(duration for duration, _ in self.queries)
+
+
+@contextmanager
+def serialization_timer(request):
+    """Добавляет время блока без SQL к `serialize` в `Server-Timing`."""
+    metrics = getattr(request, '_metrics', None)
+    if metrics is None:
+        yield
+        return
+    collector = metrics['collector']
+    started, db_started = time.perf_counter(), collector.duration
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics['serialize'] = metrics.get('serialize', 0) + elapsed - (
+            collector.duration - db_started
+        )
+
+
+class QueryMetricsMiddleware:
+    """Время SQL, представления и рендеринга ответа для каждого запроса.
+
+    Включается настройкой `QUERY_METRICS_ENABLED`. Результат отдаётся
+    в заголовке `Server-Timing`; `serialize` — часть `view` на
+    `serializer.data` без SQL, её замеряет `serialization_timer`.
+    Запросы дольше `QUERY_METRICS_SLOW_MS` или с числом SQL-запросов
+    больше `QUERY_METRICS_MAX_QUERIES` пишутся в лог `api.performance`
+    вместе с самыми долгими запросами.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = QueryCollector()
+        request._metrics = {
+            'started': time.perf_counter(), 'collector': collector,
+        }
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(collector))
+            response = self.get_response(request)
+        metrics = request._metrics
+        finished = time.perf_counter()
+        total = finished - metrics['started']
+        view = metrics.get('view_finished', finished) - metrics.get(
+            'view_started', metrics['started']
+        )
+        render = metrics.get('render_finished', 0) - metrics.get(
+            'view_finished', 0
+        )
+        serialize = metrics.get('serialize', 0)
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={collector.duration * 1000:.1f};'
+            f'desc="{len(collector.queries)} queries"',
+            f'view;dur={view * 1000:.1f}',
+            f'serialize;dur={serialize * 1000:.1f}',
+            f'render;dur={render * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ))
+        if (
+            total * 1000 > settings.QUERY_METRICS_SLOW_MS
+            or len(collector.queries) > settings.QUERY_METRICS_MAX_QUERIES
+        ):
+            self.log_slow_request(request, response, collector, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics['view_started'] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        metrics = request._metrics
+        metrics['view_finished'] = time.perf_counter()
+
+        def rendered(response):
+            metrics['render_finished'] = time.perf_counter()
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def log_slow_request(self, request, response, collector, total):
+        slowest = sorted(collector.queries, reverse=True)[:10]
+        logger.warning(
+            '%s %s: %s, %.1f ms, %d SQL-запросов за %.1f ms\n%s',
+            request.method,
+            request.get_full_path(),
+            response.status_code,
+            total * 1000,
+            len(collector.queries),
+            collector.duration * 1000,
+            '\n'.join(
+                f'{duration * 1000:.1f} ms: {sql}'
+                for duration, sql in slowest
+            ),
+        )
+
+
+class RequestMetricsMiddleware:
+    """Гистограммы времени, статусы и запросы в обработке для `/metrics`.
+
+    Метки — класс представления и действие вьюсета, например
+    `TitleViewSet.list`; запросы, не дошедшие до представления,
+    учитываются с меткой `unmatched`. Включается `METRICS_ENABLED`.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        request._metrics_view = None
+        try:
+            response = self.get_response(request)
+        except Exception:
+            self.finish(request, 500, started)
+            raise
+        self.finish(request, response.status_code, started)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_view = view_label(view_func, request.method)
+        registry.started(request._metrics_view)
+
+    def finish(self, request, status, started):
+        view = request._metrics_view
+        if view is None:
+            view = 'unmatched'
+            registry.started(view)
+        registry.finished(
+            view, request.method, status, time.perf_counter() - started
+        )
+
+
+class ProfilingMiddleware:
+    """Профилирует выборку запросов через cProfile.
+
+    Профилируется доля `PROFILING_SAMPLE_RATE` запросов и запросы
+    с подписанным заголовком `X-Profile` (см. `profile_report --token`).
+    Профили и сведения о запросе пишутся в `PROFILING_DIR`, хранятся
+    последние `PROFILING_MAX_FILES`. Включается `PROFILING_ENABLED`.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not (
+            random.random() < settings.PROFILING_SAMPLE_RATE
+            or has_profile_token(request)
+        ):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Профилировщик уже запущен в другом потоке.
+            return self.get_response(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        match = request.resolver_match
+        view = view_label(match.func, request.method) if match else None
+        save_profile(profiler, {
+            'method': request.method,
+            'path': request.path,
+            'query': request.META.get('QUERY_STRING', ''),
+            'view': view,
+            'status': response.status_code,
+            'duration': time.perf_counter() - started,
+            'time': time.time(),
+        })
+        return response
+
+
+class CompressionMiddleware:
+    """Сжимает ответы от `COMPRESSION_MIN_SIZE` байт.
+
+    Кодировка выбирается по Accept-Encoding из `COMPRESSION_ENCODINGS`
+    (brotli и zstd — если установлены соответствующие пакеты).
+    Готовые сжатые варианты из кэша ответов (атрибут `compressed`)
+    используются без повторного сжатия. Строгий ETag становится
+    слабым, как в `GZipMiddleware`. Включается `COMPRESSION_ENABLED`.
+    """
+
+    def __init__(self, get_response):
+        if not settings.COMPRESSION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+        content = getattr(response, 'compressed', {}).get(encoding)
+        if content is None:
+            content = compress(response.content, encoding)
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = encoding
+        return response
@@ -1,10 +1,225 @@
-from rest_framework import mixins, viewsets
+import hashlib
+
+from django.conf import settings
+from django.utils.http import (http_date, parse_etags, parse_http_date_safe,
+                               quote_etag)
+from rest_framework import mixins, status, viewsets
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from reviews.models import ResourceVersion
+from reviews.versions import ALL
+
+from .caching import (HIT, MISS, normalized_query, representation,
+                      response_cache)
+from .fastpath import compile_serializer
+from .metrics import registry
+from .middleware import serialization_timer
+from .pagination import (CURSOR_MODE, PAGE_MODE, PAGINATION_QUERY_PARAM,
+                         KeysetPagination)
+from .serializers import SparseFieldsMixin, is_requested
+
+
+class TimedListMixin:
+    """`list` с замером времени `serializer.data`.
+
+    Время без SQL попадает в `serialize` заголовка `Server-Timing`,
+    отдельно от выборки данных.
+    """
+
+    def serialize(self, serializer):
+        with serialization_timer(self.request):
+            return serializer.data
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(self.serialize(serializer))
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(self.serialize(serializer))
+
+
+class TimedSerializationMixin(TimedListMixin):
+    """`list` и `retrieve` с замером времени `serializer.data`."""
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+        return Response(self.serialize(serializer))
 
 
 class ListCreateDestroyViewSet(
+    TimedListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet,
 ):
     pass
+
+
+class KeysetPaginationMixin:
+    """Включает курсорную пагинацию по `keyset_ordering`.
+
+    Режим выбирается параметром запроса `?pagination=cursor|page`,
+    по умолчанию используется `pagination_mode` вьюсета.
+    """
+    keyset_ordering = None
+    pagination_mode = PAGE_MODE
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.get_pagination_mode() == CURSOR_MODE:
+                self._paginator = KeysetPagination(self.keyset_ordering)
+            else:
+                return super().paginator
+        return self._paginator
+
+    def get_pagination_mode(self):
+        request = getattr(self, 'request', None)
+        mode = self.pagination_mode
+        if request is not None:
+            mode = request.query_params.get(PAGINATION_QUERY_PARAM, mode)
+        if mode == CURSOR_MODE and self.keyset_ordering:
+            return CURSOR_MODE
+        return PAGE_MODE
+
+
+class ConditionalListMixin:
+    """ETag и Last-Modified для `list`.
+
+    Валидаторы строятся по счётчикам `ResourceVersion` из
+    `get_version_keys()` одним запросом. Если они совпадают с
+    `If-None-Match` или `If-Modified-Since`, ответ 304 отдаётся без
+    запроса данных и сериализации. Анонимные ответы 200 берутся
+    из `response_cache` по тем же версиям.
+    """
+
+    def get_version_keys(self):
+        return ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def conditional(self, handler, request, *args, **kwargs):
+        keys = sorted({ALL, *self.get_version_keys()})
+        versions = ResourceVersion.get_many(keys)
+        current = [(key, versions.get(key, (0, None))[0]) for key in keys]
+        etag = quote_etag(hashlib.md5(repr((
+            request.path,
+            normalized_query(request),
+            representation(request),
+            current,
+        )).encode()).hexdigest())
+        modified = max(
+            (modified for _, modified in versions.values()), default=None
+        )
+        if self.not_modified(request, etag, modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = self.cached(handler, request, current, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        if modified is not None:
+            response['Last-Modified'] = http_date(modified.timestamp())
+        return response
+
+    def cached(self, handler, request, versions, *args, **kwargs):
+        """Ответ из `response_cache` для анонимных пользователей."""
+        if not (response_cache.enabled and request.user.is_anonymous):
+            return handler(request, *args, **kwargs)
+        key = response_cache.key(request, versions)
+        response = response_cache.get(key)
+        result = HIT
+        if response is None:
+            result = MISS
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                response_cache.store(key, response)
+        response['X-Cache'] = result.upper()
+        registry.cache_result(f'{type(self).__name__}.{self.action}', result)
+        return response
+
+    def not_modified(self, request, etag, modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = [
+                tag[2:] if tag.startswith('W/') else tag
+                for tag in parse_etags(if_none_match)
+            ]
+            return '*' in etags or etag in etags
+        if_modified_since = parse_http_date_safe(
+            request.META.get('HTTP_IF_MODIFIED_SINCE')
+        )
+        return (
+            modified is not None and if_modified_since is not None
+            and int(modified.timestamp()) <= if_modified_since
+        )
+
+
+class ConditionalMixin(ConditionalListMixin):
+    """ETag и Last-Modified для `list` и `retrieve`."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class FastReadMixin:
+    """`list` и `retrieve` через `CompiledSerializer`.
+
+    Строки читаются из `.values()` и собираются скомпилированным
+    сериализатором без создания экземпляров моделей и дерева полей
+    на каждую строку. Если сериализатор содержит неподдерживаемые
+    поля или `FAST_READ_SERIALIZERS` выключен, используется обычный путь.
+    """
+
+    def get_compiled_serializer(self):
+        if not settings.FAST_READ_SERIALIZERS:
+            return None
+        serializer_class = self.get_serializer_class()
+        compiled = compile_serializer(serializer_class)
+        if compiled is None or not issubclass(
+            serializer_class, SparseFieldsMixin
+        ):
+            return compiled
+        names = tuple(
+            name for name in compiled.names
+            if is_requested(self.request, name)
+        )
+        if names == compiled.names:
+            return compiled
+        return compile_serializer(serializer_class, names)
+
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+        ordering = getattr(self, 'keyset_ordering', None) or ()
+        queryset = compiled.values(
+            self.filter_queryset(self.get_queryset()),
+            extra=[field.lstrip('-') for field in ordering],
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with serialization_timer(request):
+                data = compiled.serialize(page)
+            return self.get_paginated_response(data)
+        with serialization_timer(request):
+            data = compiled.serialize(queryset)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            return super().retrieve(request, *args, **kwargs)
+        queryset = compiled.values(self.filter_queryset(self.get_queryset()))
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(request, row)
+        with serialization_timer(request):
+            data = compiled.serialize_one(row)
+        return Response(data)
@@ -0,0 +1,214 @@
+import struct
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Глубже вложенные массивы и словари не разбираются: рекурсивный
+# разбор иначе упирается в предел рекурсии интерпретатора.
+MAX_DEPTH = 100
+
+
+class PackError(ValueError):
+    """Данные нельзя закодировать или разобрать как MessagePack."""
+
+
+def pack_int(value):
+    if 0 <= value < 0x80:
+        return struct.pack('B', value)
+    if -0x20 <= value < 0:
+        return struct.pack('b', value)
+    if value >= 0:
+        for code, fmt, limit in (
+            (0xcc, 'B', 0xff), (0xcd, '>H', 0xffff),
+            (0xce, '>I', 0xffffffff), (0xcf, '>Q', 0xffffffffffffffff),
+        ):
+            if value <= limit:
+                return struct.pack('B', code) + struct.pack(fmt, value)
+    else:
+        for code, fmt, limit in (
+            (0xd0, 'b', 0x80), (0xd1, '>h', 0x8000),
+            (0xd2, '>i', 0x80000000), (0xd3, '>q', 0x8000000000000000),
+        ):
+            if value >= -limit:
+                return struct.pack('B', code) + struct.pack(fmt, value)
+    raise PackError(f'Целое {value} не помещается в 64 бита.')
+
+
+def pack_header(size, fix, fix_limit, codes):
+    """Заголовок строки, массива или словаря длиной `size`."""
+    if fix is not None and size < fix_limit:
+        return struct.pack('B', fix | size)
+    for code, fmt, limit in codes:
+        if size <= limit:
+            return struct.pack('B', code) + struct.pack(fmt, size)
+    raise PackError(f'Слишком длинное значение: {size}.')
+
+
+STR_CODES = ((0xd9, 'B', 0xff), (0xda, '>H', 0xffff), (0xdb, '>I', 0xffffffff))
+BIN_CODES = ((0xc4, 'B', 0xff), (0xc5, '>H', 0xffff), (0xc6, '>I', 0xffffffff))
+ARRAY_CODES = ((0xdc, '>H', 0xffff), (0xdd, '>I', 0xffffffff))
+MAP_CODES = ((0xde, '>H', 0xffff), (0xdf, '>I', 0xffffffff))
+CONSTANTS = {None: b'\xc0', False: b'\xc2', True: b'\xc3'}
+
+
+def pack_scalar(obj):
+    """Байты числа, строки или двоичных данных, None для прочих типов."""
+    if isinstance(obj, int):
+        return pack_int(obj)
+    if isinstance(obj, float):
+        return struct.pack('>Bd', 0xcb, obj)
+    if isinstance(obj, str):
+        data = obj.encode('utf-8')
+        return pack_header(len(data), 0xa0, 32, STR_CODES) + data
+    if isinstance(obj, (bytes, bytearray)):
+        return pack_header(len(obj), None, 0, BIN_CODES) + bytes(obj)
+    return None
+
+
+def pack_into(chunks, obj, default):
+    if obj is None or obj is True or obj is False:
+        chunks.append(CONSTANTS[obj])
+    elif isinstance(obj, (list, tuple)):
+        chunks.append(pack_header(len(obj), 0x90, 16, ARRAY_CODES))
+        for item in obj:
+            pack_into(chunks, item, default)
+    elif isinstance(obj, dict):
+        chunks.append(pack_header(len(obj), 0x80, 16, MAP_CODES))
+        for key, value in obj.items():
+            pack_into(chunks, key, default)
+            pack_into(chunks, value, default)
+    else:
+        data = pack_scalar(obj)
+        if data is not None:
+            chunks.append(data)
+        elif default is not None:
+            pack_into(chunks, default(obj), None)
+        else:
+            raise PackError(f'Тип {type(obj).__name__} не поддерживается.')
+
+
+def packb(obj, default=None):
+    """MessagePack на чистом Python.
+
+    `default` преобразует неподдерживаемые значения в поддерживаемые.
+    """
+    chunks = []
+    pack_into(chunks, obj, default)
+    return b''.join(chunks)
+
+
+class Unpacker:
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+        self.depth = 0
+
+    def take(self, size):
+        end = self.offset + size
+        if end > len(self.data):
+            raise PackError('Неожиданный конец данных.')
+        chunk = self.data[self.offset:end]
+        self.offset = end
+        return chunk
+
+    def read(self, fmt):
+        return struct.unpack(fmt, self.take(struct.calcsize(fmt)))[0]
+
+    def unpack(self):
+        code = self.read('B')
+        if code <= 0x7f:
+            return code
+        if code >= 0xe0:
+            return code - 0x100
+        if 0x80 <= code <= 0x8f:
+            return self.unpack_map(code & 0x0f)
+        if 0x90 <= code <= 0x9f:
+            return self.unpack_array(code & 0x0f)
+        if 0xa0 <= code <= 0xbf:
+            return self.unpack_str(code & 0x1f)
+        if code in SIMPLE:
+            return SIMPLE[code]
+        if code in SIZED:
+            kind, fmt = SIZED[code]
+            return getattr(self, f'unpack_{kind}')(self.read(fmt))
+        if code in NUMBERS:
+            return self.read(NUMBERS[code])
+        raise PackError(f'Неподдерживаемый код 0x{code:02x}.')
+
+    def unpack_str(self, size):
+        try:
+            return bytes(self.take(size)).decode('utf-8')
+        except UnicodeDecodeError as exc:
+            raise PackError(str(exc))
+
+    def unpack_bin(self, size):
+        return bytes(self.take(size))
+
+    def nested(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise PackError(f'Вложенность больше {MAX_DEPTH}.')
+
+    def unpack_array(self, size):
+        self.nested()
+        result = [self.unpack() for _ in range(size)]
+        self.depth -= 1
+        return result
+
+    def unpack_map(self, size):
+        self.nested()
+        result = {}
+        for _ in range(size):
+            key = self.unpack()
+            if isinstance(key, (list, dict)):
+                raise PackError('Ключ словаря должен быть скаляром.')
+            result[key] = self.unpack()
+        self.depth -= 1
+        return result
+
+
+SIMPLE = {0xc0: None, 0xc2: False, 0xc3: True}
+SIZED = {
+    0xc4: ('bin', 'B'), 0xc5: ('bin', '>H'), 0xc6: ('bin', '>I'),
+    0xd9: ('str', 'B'), 0xda: ('str', '>H'), 0xdb: ('str', '>I'),
+    0xdc: ('array', '>H'), 0xdd: ('array', '>I'),
+    0xde: ('map', '>H'), 0xdf: ('map', '>I'),
+}
+NUMBERS = {
+    0xca: '>f', 0xcb: '>d',
+    0xcc: 'B', 0xcd: '>H', 0xce: '>I', 0xcf: '>Q',
+    0xd0: 'b', 0xd1: '>h', 0xd2: '>i', 0xd3: '>q',
+}
+
+
+def unpackb(data):
+    """Разбор MessagePack на чистом Python."""
+    unpacker = Unpacker(memoryview(data))
+    result = unpacker.unpack()
+    if unpacker.offset != len(data):
+        raise PackError('Лишние данные после значения.')
+    return result
+
+
+def pack(obj, default=None):
+    """MessagePack через библиотеку msgpack, если она установлена."""
+    if msgpack is None:
+        return packb(obj, default)
+    try:
+        return msgpack.packb(
+            obj, default=default, use_bin_type=True, datetime=False
+        )
+    except (TypeError, OverflowError, ValueError) as exc:
+        raise PackError(str(exc))
+
+
+def unpack(data):
+    if msgpack is None:
+        return unpackb(data)
+    try:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    except (ValueError, TypeError, msgpack.UnpackException) as exc:
+        raise PackError(str(exc))
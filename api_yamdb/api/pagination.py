@@ -0,0 +1,161 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+PAGINATION_QUERY_PARAM = 'pagination'
+PAGE_MODE = 'page'
+CURSOR_MODE = 'cursor'
+
+COUNT_EXACT = 'exact'
+COUNT_NONE = 'none'
+COUNT_CACHED = 'cached'
+COUNT_ESTIMATE = 'estimate'
+COUNT_MODES = (COUNT_EXACT, COUNT_NONE, COUNT_CACHED, COUNT_ESTIMATE)
+
+ESTIMATE_QUERIES = {
+    'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+    'mysql': (
+        'SELECT table_rows FROM information_schema.tables '
+        'WHERE table_schema = DATABASE() AND table_name = %s'
+    ),
+    'sqlite': 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+}
+
+
+def estimate_count(queryset):
+    """Оценка числа строк по статистике СУБД, только для всей таблицы."""
+    if queryset.query.where:
+        return None
+    connection = connections[queryset.db]
+    sql = ESTIMATE_QUERIES.get(connection.vendor)
+    if sql is None:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+def cached_count(queryset):
+    sql, params = queryset.query.sql_with_params()
+    key = 'pagination-count:' + hashlib.md5(
+        repr((queryset.db, sql, params)).encode()
+    ).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class CountModePagination(PageNumberPagination):
+    """Постраничная пагинация с выбором способа подсчёта `count`.
+
+    `?count=exact` считает `COUNT(*)`, `none` не возвращает `count`,
+    `cached` берёт значение из кэша, `estimate` — из статистики таблицы.
+    """
+    count_query_param = 'count'
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(
+            self.count_query_param, settings.PAGINATION_COUNT_MODE
+        )
+        return mode if mode in COUNT_MODES else COUNT_EXACT
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = self.get_count_mode(request)
+        if self.count_mode == COUNT_EXACT:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        page_number = request.query_params.get(self.page_query_param, 1)
+        if page_number in self.last_page_strings:
+            # Без точного числа строк номер последней страницы неизвестен.
+            raise ValidationError({
+                self.page_query_param: (
+                    f'Страница {page_number} доступна только с '
+                    f'{self.count_query_param}={COUNT_EXACT}.'
+                )
+            })
+        try:
+            self.page_number = int(page_number)
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message)
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and self.page_number > 1:
+            raise NotFound(self.invalid_page_message)
+        self.has_next = len(rows) > page_size
+        self.request = request
+        self.count = self.get_count(queryset, offset + len(rows))
+        return rows[:page_size]
+
+    def get_count(self, queryset, seen):
+        if self.count_mode == COUNT_NONE:
+            return None
+        if not self.has_next:
+            return seen
+        count = None
+        if self.count_mode == COUNT_ESTIMATE:
+            count = estimate_count(queryset)
+        if count is None:
+            count = cached_count(queryset)
+        return max(count, seen)
+
+    def get_next_link(self):
+        if self.count_mode == COUNT_EXACT:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.page_query_param, self.page_number + 1
+        )
+
+    def get_previous_link(self):
+        if self.count_mode == COUNT_EXACT:
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
+
+    def get_paginated_response(self, data):
+        if self.count_mode == COUNT_EXACT:
+            return super().get_paginated_response(data)
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count_mode != COUNT_NONE:
+            payload = {'count': self.count, **payload}
+        return Response(payload)
+
+
+class KeysetPagination(CursorPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def __init__(self, ordering):
+        self.ordering = ordering
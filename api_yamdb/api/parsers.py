@@ -0,0 +1,42 @@
+import codecs
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from .packing import PackError, unpack
+from .renderers import FastJSONRenderer, MessagePackRenderer
+
+
+class FastJSONParser(JSONParser):
+    """`JSONParser` на orjson, если он установлен и тело в UTF-8."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if (
+            orjson is None or not self.strict
+            or codecs.lookup(encoding).name != 'utf-8'
+        ):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackParser(BaseParser):
+    media_type = MessagePackRenderer.media_type
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return unpack(stream.read())
+        except (PackError, RecursionError) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
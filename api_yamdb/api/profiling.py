@@ -0,0 +1,60 @@
+import glob
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core import signing
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_SALT = 'api.profiling'
+
+
+def make_profile_token():
+    """Значение заголовка `X-Profile`, включающего профилирование запроса."""
+    return signing.TimestampSigner(salt=PROFILE_SALT).sign('profile')
+
+
+def has_profile_token(request):
+    token = request.META.get(PROFILE_HEADER)
+    if not token:
+        return False
+    try:
+        signing.TimestampSigner(salt=PROFILE_SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def save_profile(profiler, metadata):
+    """Сохраняет профиль и сведения о запросе, удаляя самые старые."""
+    directory = settings.PROFILING_DIR
+    os.makedirs(directory, exist_ok=True)
+    name = os.path.join(
+        directory, f'{time.time_ns()}-{os.getpid()}'
+    )
+    profiler.dump_stats(f'{name}.prof')
+    with open(f'{name}.json', 'w', encoding='utf-8') as file:
+        json.dump(metadata, file, ensure_ascii=False)
+    for old in stored_profiles(directory)[:-settings.PROFILING_MAX_FILES]:
+        for path in (f'{old}.prof', f'{old}.json'):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def stored_profiles(directory):
+    """Пути сохранённых профилей без расширения, от старых к новым."""
+    return sorted(
+        path[:-len('.prof')]
+        for path in glob.glob(os.path.join(directory, '*.prof'))
+    )
+
+
+def load_metadata(name):
+    try:
+        with open(f'{name}.json', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
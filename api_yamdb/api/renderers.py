@@ -0,0 +1,121 @@
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .packing import pack
+
+COLUMNS_LAYOUT = 'columns'
+
+
+def media_type_params(media_type):
+    """Параметры типа из Accept, без требований к кодировке значений."""
+    params = {}
+    for part in (media_type or '').split(';')[1:]:
+        name, _, value = part.partition('=')
+        params[name.strip().lower()] = value.strip().strip('"')
+    return params
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Текстовый формат экспозиции Prometheus."""
+
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+    # Параметр версии не входит в media_type, иначе DRF не сопоставит
+    # его с Accept: */*.
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = f'{data.get("detail", data)}\n'
+        return data.encode(self.charset)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """`JSONRenderer` на orjson, если он установлен.
+
+    Даты и время orjson кодирует сам, остальные типы (`Decimal`,
+    ленивые строки) передаются в `default` кодировщика DRF, поэтому
+    ответ совпадает с `JSONRenderer` побайтно. Отступы (`indent=` в
+    Accept, браузерный API), отсутствие orjson и значения, которые
+    он не умеет кодировать, обрабатываются стандартным `json`.
+    """
+
+    options = (
+        orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else None
+    )
+    default = JSONEncoder().default
+
+    def get_indent(self, accepted_media_type, renderer_context):
+        try:
+            indent = int(media_type_params(accepted_media_type)['indent'])
+        except (KeyError, ValueError):
+            return renderer_context.get('indent')
+        return max(min(indent, 8), 0) or None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or not self.compact
+            or self.ensure_ascii or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как и JSONRenderer, экранируем U+2028 и U+2029.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029'
+            )
+        return ret
+
+
+def columnar(rows):
+    """Строки одного вида в виде `{'columns': [...], 'rows': [[...]]}`."""
+    if not rows or not all(isinstance(row, dict) for row in rows):
+        return rows
+    columns = list(rows[0])
+    if any(list(row) != columns for row in rows):
+        return rows
+    return {
+        'columns': columns,
+        'rows': [list(row.values()) for row in rows],
+    }
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Ответ в MessagePack для внутренних сервисов.
+
+    Значения, которых нет в MessagePack (даты, `Decimal`), кодируются
+    так же, как в JSON. С `Accept: application/x-msgpack; layout=columns`
+    списки (в том числе `results` страницы) передаются по столбцам:
+    имена полей один раз на страницу, затем строки значений.
+    """
+
+    media_type = 'application/x-msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    default = JSONEncoder().default
+
+    def get_layout(self, accepted_media_type):
+        layout = media_type_params(accepted_media_type).get('layout')
+        return COLUMNS_LAYOUT if layout == COLUMNS_LAYOUT else None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_layout(accepted_media_type) == COLUMNS_LAYOUT:
+            if isinstance(data, list):
+                data = columnar(data)
+            elif isinstance(data, dict) and isinstance(
+                data.get('results'), list
+            ):
+                data = {**data, 'results': columnar(data['results'])}
+        return pack(data, default=self.default)
@@ -1,11 +1,56 @@
 import re
 
+from django.conf import settings
 from django.http import Http404
-from rest_framework import serializers
+from rest_framework import permissions, serializers
 from rest_framework.generics import get_object_or_404
+from reviews import catalog
 from reviews.models import Category, Comment, Genre, Review, Title, User
 
 
+SUGGEST_TYPES = ('titles', 'genres', 'categories')
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def field_names(request, param):
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def is_requested(request, name):
+    """Нужно ли поле `name` в ответе на запрос чтения.
+
+    `?fields=id,name` оставляет только перечисленные поля,
+    `?omit=description` убирает перечисленные. Неизвестные имена
+    игнорируются, запросы записи всегда получают все поля.
+    """
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return True
+    fields = field_names(request, FIELDS_PARAM)
+    if fields is not None and name not in fields:
+        return False
+    return name not in (field_names(request, OMIT_PARAM) or ())
+
+
+class SparseFieldsMixin:
+    """Поля ответа по параметрам `?fields=` и `?omit=`.
+
+    Учитывается только запрос из собственного контекста сериализатора,
+    поэтому вложенные сериализаторы не обрезаются.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = getattr(self, '_context', {}).get('request')
+        return {
+            name: field for name, field in fields.items()
+            if is_requested(request, name)
+        }
+
+
 class SignupSerializer(serializers.ModelSerializer):
     username = serializers.CharField(max_length=150)
     email = serializers.EmailField(max_length=254)
@@ -41,7 +86,7 @@ class SignupSerializer(serializers.ModelSerializer):
         fields = ('username', 'email',)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     def validate_username(self, value):
         pattern = re.compile('^[\\w]{3,}')
@@ -89,21 +134,54 @@ class TokenSerializer(serializers.Serializer):
         fields = ('username', 'confirmation_code')
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CatalogSlugRelatedField(serializers.SlugRelatedField):
+    def __init__(self, catalog, **kwargs):
+        self.catalog = catalog
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            instance = self.catalog.get(data)
+            if instance is not None:
+                return instance
+        return super().to_internal_value(data)
+
+    def check_exists(self, instances):
+        """Проверяет, что объекты из справочника ещё есть в базе.
+
+        Справочник в памяти процесса не узнаёт об удалениях в других
+        процессах, поэтому без общего `CATALOG_CACHE` объекты
+        проверяются одним запросом перед сохранением.
+        """
+        if self.catalog.shared_cache is not None or not instances:
+            return
+        existing = set(self.get_queryset().filter(
+            pk__in=[instance.pk for instance in instances]
+        ).values_list('pk', flat=True))
+        for instance in instances:
+            if instance.pk not in existing:
+                self.catalog.invalidate()
+                self.fail(
+                    'does_not_exist', slug_name=self.slug_field,
+                    value=getattr(instance, self.slug_field),
+                )
+
+
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Category
         fields = ('name', 'slug',)
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Genre
         fields = ('name', 'slug',)
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
     rating = serializers.IntegerField(read_only=True)
@@ -121,20 +199,40 @@ class TitleReadSerializer(serializers.ModelSerializer):
         )
 
 
-class TitleRecSerializer(serializers.ModelSerializer):
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(), slug_field='slug', many=True
+class TitleRecSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    genre = CatalogSlugRelatedField(
+        catalog=catalog.genres,
+        queryset=Genre.objects.all(),
+        slug_field='slug',
+        many=True,
     )
-    category = serializers.SlugRelatedField(
-        queryset=Category.objects.all(), slug_field='slug'
+    category = CatalogSlugRelatedField(
+        catalog=catalog.categories,
+        queryset=Category.objects.all(),
+        slug_field='slug',
     )
 
+    def validate(self, data):
+        for name in ('category', 'genre'):
+            value = data.get(name)
+            if value is None:
+                continue
+            field = self.fields[name]
+            relation = getattr(field, 'child_relation', field)
+            try:
+                relation.check_exists(
+                    value if isinstance(value, list) else [value]
+                )
+            except serializers.ValidationError as exc:
+                raise serializers.ValidationError({name: exc.detail})
+        return data
+
     class Meta:
         model = Title
         fields = ('id', 'name', 'year', 'category', 'genre', 'description',)
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True
@@ -160,7 +258,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date', 'title')
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username'
@@ -169,3 +267,13 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+
+
+class SuggestQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    type = serializers.MultipleChoiceField(
+        choices=SUGGEST_TYPES, required=False
+    )
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.SUGGEST_MAX_LIMIT, default=10
+    )
@@ -2,8 +2,8 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, SignupAPIView, TitleViewSet, TokenAPIView,
-                    UsersViewSet)
+                    ReviewViewSet, SignupAPIView, SuggestAPIView, TitleViewSet,
+                    TokenAPIView, UsersViewSet)
 
 router_v1 = DefaultRouter()
 router_v1.register(
@@ -25,4 +25,5 @@ urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/signup/', SignupAPIView.as_view()),
     path('v1/auth/token/', TokenAPIView.as_view()),
+    path('v1/suggest/', SuggestAPIView.as_view()),
 ]
@@ -1,5 +1,5 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
@@ -7,16 +7,25 @@ from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (Category, Comment, Genre, OutboxMessage, Review,
+                            Title, User)
+from reviews.suggest import suggestions
+from reviews.versions import (AUTHORS, CATEGORIES, GENRES, TITLES,
+                              comments_key, reviews_key, title_key)
 
+from .authentication import access_token_for, get_cached_user
 from .filters import TitleFilter
-from .mixins import ListCreateDestroyViewSet
+from .metrics import registry
+from .mixins import (ConditionalListMixin, ConditionalMixin, FastReadMixin,
+                     KeysetPaginationMixin, ListCreateDestroyViewSet,
+                     TimedSerializationMixin)
 from .permissions import AnonReadOnly, IsAdmin, IsAdminModeratorOwnerOrReadOnly
-from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, ReviewSerializer, SignupSerializer,
+from .renderers import PrometheusRenderer
+from .serializers import (SUGGEST_TYPES, CategorySerializer,
+                          CommentSerializer, GenreSerializer, ReviewSerializer,
+                          SignupSerializer, SuggestQuerySerializer,
                           TitleReadSerializer, TitleRecSerializer,
-                          TokenSerializer, UserSerializer)
+                          TokenSerializer, UserSerializer, is_requested)
 
 
 class SignupAPIView(APIView):
@@ -25,13 +34,7 @@ class SignupAPIView(APIView):
     serializer_class = SignupSerializer
 
     def mail(self, code, mail):
-        send_mail(
-            'Код',
-            '%s' % code,
-            'from@example.com',
-            [mail],
-            fail_silently=False,
-        )
+        OutboxMessage.enqueue(mail, 'Код', '%s' % code)
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
@@ -41,8 +44,9 @@ class SignupAPIView(APIView):
                                             username=data['username'])
         token = default_token_generator.make_token(user)
         user.is_active = False
-        self.mail(token, user.email)
-        user.save()
+        with transaction.atomic():
+            user.save()
+            self.mail(token, user.email)
         return Response(
             {
                 'email': str(user.email),
@@ -62,11 +66,10 @@ class TokenAPIView(APIView):
                                  username=data['username'])
         if default_token_generator.check_token(user, data['password']):
             user.is_active = True
-            refresh = RefreshToken.for_user(user)
             user.save()
             return Response(
                 {
-                    'token': str(refresh.access_token)
+                    'token': str(access_token_for(user))
                 }, status=status.HTTP_200_OK
             )
         return Response(
@@ -76,7 +79,37 @@ class TokenAPIView(APIView):
         )
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+class SuggestAPIView(APIView):
+    permission_classes = (AllowAny,)
+    authentication_classes = ()
+    serializer_class = SuggestQuerySerializer
+
+    def get(self, request):
+        serializer = self.serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        kinds = [
+            kind for kind in SUGGEST_TYPES
+            if kind in (data.get('type') or SUGGEST_TYPES)
+        ]
+        return Response(
+            suggestions.search(data['q'], kinds, data['limit']),
+            status=status.HTTP_200_OK
+        )
+
+
+class MetricsAPIView(APIView):
+    permission_classes = (IsAdmin,)
+    renderer_classes = (PrometheusRenderer,)
+
+    def get(self, request):
+        return Response(
+            registry.render(), status=status.HTTP_200_OK,
+            content_type=PrometheusRenderer.content_type
+        )
+
+
+class UsersViewSet(TimedSerializationMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
@@ -92,6 +125,8 @@ class UsersViewSet(viewsets.ModelViewSet):
     )
     def me(self, request):
         instance = request.user
+        if not isinstance(instance, User):
+            instance = get_cached_user(User, instance.pk)
         if request.method == 'GET':
             serializer = self.get_serializer(instance)
             return Response(serializer.data)
@@ -105,7 +140,7 @@ class UsersViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(ConditionalListMixin, ListCreateDestroyViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdmin | AnonReadOnly]
@@ -113,8 +148,11 @@ class CategoryViewSet(ListCreateDestroyViewSet):
     search_fields = ("name",)
     lookup_field = "slug"
 
+    def get_version_keys(self):
+        return (CATEGORIES,)
 
-class GenreViewSet(ListCreateDestroyViewSet):
+
+class GenreViewSet(ConditionalListMixin, ListCreateDestroyViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [IsAdmin | AnonReadOnly]
@@ -122,47 +160,96 @@ class GenreViewSet(ListCreateDestroyViewSet):
     search_fields = ("name",)
     lookup_field = "slug"
 
+    def get_version_keys(self):
+        return (GENRES,)
+
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalMixin, FastReadMixin, KeysetPaginationMixin,
+                   TimedSerializationMixin, viewsets.ModelViewSet):
     queryset = Title.objects.all()
     permission_classes = [IsAdmin | AnonReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_class = TitleFilter
+    keyset_ordering = ('name', 'id')
+
+    def get_queryset(self):
+        if self.action not in ('list', 'retrieve'):
+            return super().get_queryset()
+        queryset = self.queryset
+        if is_requested(self.request, 'category'):
+            queryset = queryset.select_related('category')
+        if is_requested(self.request, 'genre'):
+            queryset = queryset.prefetch_related('genre')
+        if not is_requested(self.request, 'description'):
+            queryset = queryset.defer('description')
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleReadSerializer
         return TitleRecSerializer
 
+    def get_version_keys(self):
+        if self.action == 'retrieve':
+            # Карточка содержит названия категории и жанров.
+            return (CATEGORIES, GENRES, title_key(self.kwargs['pk']))
+        return (TITLES,)
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+def sparse_queryset(queryset, request):
+    """Отзывы или комментарии без автора и текста, если они не нужны."""
+    if is_requested(request, 'author'):
+        queryset = queryset.select_related('author')
+    if not is_requested(request, 'text'):
+        queryset = queryset.defer('text')
+    return queryset
+
+
+class ReviewViewSet(ConditionalMixin, FastReadMixin, KeysetPaginationMixin,
+                    TimedSerializationMixin, viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [IsAdminModeratorOwnerOrReadOnly]
     http_method_names = ['get', 'post', 'patch', 'delete']
+    keyset_ordering = ('-pub_date', '-id')
 
     def get_queryset(self):
         title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        new_queryset = title.reviews.all()
-        return new_queryset
+        return sparse_queryset(title.reviews.all(), self.request)
+
+    def get_version_keys(self):
+        return (AUTHORS, reviews_key(self.kwargs.get('title_id')))
 
+    @transaction.atomic
     def perform_create(self, serializer):
         title = get_object_or_404(
             Title,
             id=self.kwargs.get('title_id'))
         serializer.save(author=self.request.user, title=title)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
 
-class CommentViewSet(viewsets.ModelViewSet):
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
+
+class CommentViewSet(ConditionalMixin, FastReadMixin, KeysetPaginationMixin,
+                     TimedSerializationMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [IsAdminModeratorOwnerOrReadOnly]
     http_method_names = ['get', 'post', 'patch', 'delete']
+    keyset_ordering = ('pub_date', 'id')
 
     def get_queryset(self):
         review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        new_queryset_comments = review.comments.all()
-        return new_queryset_comments
+        return sparse_queryset(review.comments.all(), self.request)
+
+    def get_version_keys(self):
+        return (AUTHORS, comments_key(self.kwargs.get('review_id')))
 
     def perform_create(self, serializer):
         title_id = self.kwargs.get('title_id')
@@ -33,6 +33,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
+    'api.middleware.QueryMetricsMiddleware',
+    'api.middleware.ProfilingMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -117,11 +121,71 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'api.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CountModePagination',
     'PAGE_SIZE': 10,
 }
+# exact | none | cached | estimate, переопределяется параметром ?count=
+PAGINATION_COUNT_MODE = os.getenv('PAGINATION_COUNT_MODE', 'exact')
+PAGINATION_COUNT_CACHE_TIMEOUT = int(
+    os.getenv('PAGINATION_COUNT_CACHE_TIMEOUT', 60)
+)
+# Алиас из CACHES для общего кэша справочников категорий и жанров,
+# None — только память процесса.
+CATALOG_CACHE = os.getenv('CATALOG_CACHE') or None
+CATALOG_TIMEOUT = int(os.getenv('CATALOG_TIMEOUT', 300))
+SUGGEST_TIMEOUT = int(os.getenv('SUGGEST_TIMEOUT', 300))
+SUGGEST_MAX_LIMIT = 50
+# Заголовок Server-Timing и журнал медленных запросов
+QUERY_METRICS_ENABLED = os.getenv('QUERY_METRICS_ENABLED', '0') == '1'
+QUERY_METRICS_SLOW_MS = int(os.getenv('QUERY_METRICS_SLOW_MS', 500))
+QUERY_METRICS_MAX_QUERIES = int(os.getenv('QUERY_METRICS_MAX_QUERIES', 30))
+# Сжатие ответов: кодировки в порядке предпочтения, br и zstd —
+# если установлены brotli и zstandard.
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', '1') == '1'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_ENCODINGS = tuple(
+    os.getenv('COMPRESSION_ENCODINGS', 'br,zstd,gzip').split(',')
+)
+# Чтение списков и карточек через скомпилированные сериализаторы
+FAST_READ_SERIALIZERS = os.getenv('FAST_READ_SERIALIZERS', '1') == '1'
+# Кэш ответов на анонимные запросы чтения, пустое значение отключает.
+# При нескольких процессах нужен общий кэш (Redis, Memcached).
+RESPONSE_CACHE = os.getenv('RESPONSE_CACHE', 'default') or None
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300))
+# Метрики Prometheus на /metrics. METRICS_DIR — общий каталог
+# снимков для нескольких процессов (воркеров gunicorn).
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+# Профилирование выборки запросов: python manage.py profile_report
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', '0') == '1'
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+PROFILING_DIR = os.getenv('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILING_MAX_FILES = int(os.getenv('PROFILING_MAX_FILES', 200))
+PROFILING_TOKEN_MAX_AGE = int(os.getenv('PROFILING_TOKEN_MAX_AGE', 60 * 60))
+# Кэш снимков пользователей для CachedJWTAuthentication
+AUTH_USER_CACHE = os.getenv('AUTH_USER_CACHE', 'default')
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+# Доверять роли из access-токена для безопасных методов
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv('AUTH_TRUST_TOKEN_CLAIMS', '1') == '1'
+AUTH_TOKEN_VERSION_TIMEOUT = int(
+    os.getenv('AUTH_TOKEN_VERSION_TIMEOUT', 24 * 60 * 60)
+)
+# Срок для кэша памяти процесса: его нельзя сбросить в других воркерах
+AUTH_LOCAL_CACHE_TIMEOUT = int(os.getenv('AUTH_LOCAL_CACHE_TIMEOUT', 5))
 SIMPLE_JWT = {
 
     'ACCESS_TOKEN_LIFETIME': timedelta(days=14),
@@ -131,5 +195,14 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
 }
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND', 'django.core.mail.backends.filebased.EmailBackend'
+)
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+DEFAULT_FROM_EMAIL = 'from@example.com'
+# Очередь писем: python manage.py send_queued_mail --loop
+MAIL_QUEUE_MAX_ATTEMPTS = 5
+MAIL_QUEUE_RETRY_DELAY = 60
+MAIL_QUEUE_MAX_DELAY = 3600
+# На сколько секунд воркер забирает пачку писем на время отправки
+MAIL_QUEUE_LEASE = 300
@@ -2,7 +2,8 @@ from django.contrib import admin
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 
-from .models import Category, Comment, Genre, GenreTitle, Review, Title, User
+from .models import (Category, Comment, Genre, GenreTitle, OutboxMessage,
+                     Review, Title, User)
 
 
 class UserResource(resources.ModelResource):
@@ -31,6 +32,8 @@ class TitleResource(resources.ModelResource):
         model = Title
         exclude = ('id',
                    'rating',
+                   'score_sum',
+                   'score_count',
                    'description',
                    'genre',)
         import_id_fields = ('name',
@@ -129,3 +132,15 @@ class ReviewAdmin(ImportExportModelAdmin):
                     'author',
                     'score',
                     'pub_date',)
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('recipient',
+                    'subject',
+                    'status',
+                    'attempts',
+                    'send_after',
+                    'sent_at',)
+    list_filter = ('status',)
+    search_fields = ('recipient',)
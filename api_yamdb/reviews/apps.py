@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using='default', **kwargs):
+    # Пересоздание таблицы в миграциях SQLite удаляет триггеры индекса.
+    if 'reviews_title' in connections[using].introspection.table_names():
+        from .search import install_search_index
+        install_search_index(using)
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(ensure_search_index, sender=self)
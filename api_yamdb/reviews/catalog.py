@@ -0,0 +1,102 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Category, Genre
+
+
+class Catalog:
+    """Кэш slug -> объект для небольших справочников.
+
+    Данные загружаются из базы при первом обращении и хранятся в памяти
+    процесса не дольше `CATALOG_TIMEOUT` секунд. Если задан
+    `CATALOG_CACHE`, снимок справочника дополнительно кладётся в общий
+    кэш, чтобы инвалидация доходила до всех процессов.
+    """
+    fields = ('id', 'name', 'slug')
+
+    def __init__(self, model):
+        self.model = model
+        self.cache_key = f'catalog:{model._meta.label_lower}'
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires = 0
+        self._by_slug = {}
+        self._by_lower_slug = {}
+
+    def __deepcopy__(self, memo):
+        # Поля DRF копируют свои аргументы, справочник должен быть общим.
+        return self
+
+    @property
+    def shared_cache(self):
+        alias = getattr(settings, 'CATALOG_CACHE', None)
+        return caches[alias] if alias else None
+
+    def _load(self):
+        rows = list(
+            self.model.objects.order_by().values_list(*self.fields)
+        )
+        return uuid.uuid4().hex, rows
+
+    def _snapshot(self):
+        shared = self.shared_cache
+        if shared is None:
+            if self._token is not None and time.monotonic() < self._expires:
+                return self._token, None
+            return self._load()
+        snapshot = shared.get(self.cache_key)
+        if snapshot is None:
+            snapshot = self._load()
+            shared.set(self.cache_key, snapshot, settings.CATALOG_TIMEOUT)
+        return snapshot
+
+    def _ensure_loaded(self):
+        token, rows = self._snapshot()
+        if token == self._token:
+            return
+        with self._lock:
+            by_slug = {}
+            by_lower_slug = {}
+            for row in rows:
+                by_slug[row[2]] = row
+                by_lower_slug.setdefault(row[2].lower(), []).append(row[0])
+            self._by_slug = by_slug
+            self._by_lower_slug = by_lower_slug
+            self._token = token
+            self._expires = time.monotonic() + settings.CATALOG_TIMEOUT
+
+    def get(self, slug):
+        """Возвращает объект модели по точному slug без запроса к базе."""
+        self._ensure_loaded()
+        row = self._by_slug.get(slug)
+        if row is None:
+            return None
+        return self.model.from_db(
+            self.model.objects.db, self.fields, row
+        )
+
+    def ids_iexact(self, slug):
+        self._ensure_loaded()
+        return self._by_lower_slug.get(slug.lower(), [])
+
+    def invalidate(self):
+        with self._lock:
+            self._token = None
+            self._expires = 0
+        shared = self.shared_cache
+        if shared is not None:
+            shared.delete(self.cache_key)
+
+    def invalidate_on_commit(self):
+        self.invalidate()
+        transaction.on_commit(self.invalidate)
+
+
+categories = Catalog(Category)
+genres = Catalog(Genre)
+CATALOGS = {Category: categories, Genre: genres}
@@ -0,0 +1,106 @@
+import csv
+import os
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.core.management import BaseCommand, CommandError
+from reviews.catalog import CATALOGS
+from reviews.suggest import suggestions
+from reviews.synthetic import FIELDS, MODELS, Dataset
+from reviews.versions import touch_all
+
+from .load_base import TABLES
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетические данные в базу или в csv-файлы '
+        'для load_base.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument(
+            '--exponent',
+            type=float,
+            default=1.1,
+            help='Показатель закона Ципфа для отзывов по произведениям.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора: одинаковое зерно даёт одинаковые данные.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной транзакции.',
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='Сколько процессов генерируют отзывы и комментарии.',
+        )
+        parser.add_argument(
+            '--csv-dir',
+            help='Записать csv-файлы для load_base в каталог вместо базы.',
+        )
+
+    def handle(self, *args, **options):
+        for option in ('titles', 'users', 'categories', 'genres',
+                       'batch_size', 'jobs'):
+            if options[option] < 1:
+                raise CommandError(
+                    f'--{option.replace("_", "-")} должен быть больше нуля.'
+                )
+        dataset = Dataset(
+            options['titles'], options['users'], options['reviews'],
+            options['comments'], categories=options['categories'],
+            genres=options['genres'], seed=options['seed'],
+            exponent=options['exponent'],
+        )
+        started = time.monotonic()
+        if options['csv_dir']:
+            counts = self.write_csv(dataset, options['csv_dir'], options)
+        else:
+            counts = self.write_db(dataset, options)
+        for model in MODELS:
+            self.stdout.write(f'{TABLES[model]}: {counts[model]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные сгенерированы за {time.monotonic() - started:.1f} с'
+        ))
+
+    def write_db(self, dataset, options):
+        counts = dataset.save(options['batch_size'], options['jobs'])
+        for catalog in CATALOGS.values():
+            catalog.invalidate()
+        suggestions.invalidate()
+        touch_all()
+        return counts
+
+    def write_csv(self, dataset, csv_dir, options):
+        os.makedirs(csv_dir, exist_ok=True)
+        counts = Counter()
+        with ExitStack() as stack:
+            writers = {}
+            for model in MODELS:
+                csv_file = stack.enter_context(open(
+                    os.path.join(csv_dir, TABLES[model]), 'w',
+                    encoding='utf-8', newline='',
+                ))
+                writers[model] = csv.DictWriter(csv_file, FIELDS[model])
+                writers[model].writeheader()
+            first_ids = {model: 1 for model in MODELS}
+            for model, rows in dataset.rows(first_ids, options['jobs']):
+                writers[model].writerows(rows)
+                counts[model] += len(rows)
+        return counts
@@ -1,9 +1,22 @@
 import csv
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from itertools import islice
 
 from django.conf import settings
-from django.core.management import BaseCommand
-from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
-                            Title, User)
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, connections, models, transaction
+from reviews.catalog import CATALOGS
+from reviews.models import (ACCESS_FIELDS, Category, Comment, Genre,
+                            GenreTitle, Review, Title, User,
+                            bulk_create_as_is)
+from reviews.suggest import suggestions
+from reviews.versions import touch_all
 
 TABLES = {
     Category: 'category.csv',
@@ -14,18 +27,264 @@ TABLES = {
     Review: 'review.csv',
     Comment: 'comments.csv',
 }
+CHECKPOINT_FILE = '.load_base_checkpoint.json'
+INSERT = 'insert'
+UPSERT = 'upsert'
+
+
+def table_dependencies(tables):
+    """Для каждой модели — модели из `tables`, на которые она ссылается."""
+    return {
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.many_to_one and field.related_model in tables
+            and field.related_model is not model
+        }
+        for model in tables
+    }
+
+
+def datetime_fields(model, header):
+    return [
+        name for name in header
+        if isinstance(model._meta.get_field(name), models.DateTimeField)
+    ]
+
+
+def clean_row(data, dates):
+    # В исходных csv часовой пояс записан как `z`, а Django разбирает
+    # только `Z`.
+    for name in dates:
+        if data[name]:
+            data[name] = data[name].upper()
+    return data
+
+
+class Checkpoint:
+    """Количество уже загруженных строк каждого файла."""
+
+    def __init__(self, path, resume):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done = {}
+        if resume and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as checkpoint:
+                self.done = json.load(checkpoint)
+
+    def get(self, csv_f):
+        return self.done.get(csv_f, 0)
+
+    def save(self, csv_f, rows):
+        with self.lock:
+            self.done[csv_f] = rows
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as checkpoint:
+                json.dump(self.done, checkpoint)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
 
 
 class Command(BaseCommand):
+    help = 'Загружает данные из csv-файлов в базу.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с csv-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк в одной транзакции.',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить загрузку с последней сохранённой пачки.',
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='Сколько независимых таблиц загружать одновременно.',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=(INSERT, UPSERT),
+            default=INSERT,
+            help=(
+                'insert — только добавлять строки, upsert — добавлять новые '
+                'и обновлять изменившиеся строки по id.'
+            ),
+        )
 
-    def handle(self, *args, **kwargs):
-        for model, csv_f in TABLES.items():
-            with open(
-                f'{settings.BASE_DIR}/static/data/{csv_f}',
-                'r',
-                encoding='utf-8'
-            ) as csv_file:
-                reader = csv.DictReader(csv_file)
-                model.objects.bulk_create(
-                    model(**data) for data in reader)
+    def handle(self, *args, **options):
+        data_dir = options['data_dir']
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        if options['jobs'] < 1:
+            raise CommandError('--jobs должен быть больше нуля.')
+        if not os.path.isdir(data_dir):
+            raise CommandError(f'Каталог {data_dir} не найден.')
+        checkpoint = Checkpoint(
+            os.path.join(data_dir, CHECKPOINT_FILE), options['resume']
+        )
+        self.mode = options['mode']
+        # SQLite не допускает параллельной записи, потоки пишут по очереди.
+        self.write_lock = (
+            threading.Lock() if connection.vendor == 'sqlite'
+            else nullcontext()
+        )
+        timings = self.load_tables(
+            data_dir, batch_size, checkpoint, options['jobs'],
+            options['verbosity'],
+        )
+        if options['verbosity'] > 0:
+            for model, csv_f in TABLES.items():
+                counts, elapsed = timings[model]
+                self.stdout.write(
+                    f'{csv_f}: добавлено {counts["inserted"]}, '
+                    f'обновлено {counts["updated"]}, '
+                    f'без изменений {counts["unchanged"]} '
+                    f'за {elapsed:.2f} с'
+                )
+        checkpoint.clear()
+        Title.rebuild_ratings()
+        for catalog in CATALOGS.values():
+            catalog.invalidate()
+        suggestions.invalidate()
+        touch_all()
         self.stdout.write(self.style.SUCCESS('Загрузка завершена!'))
+
+    def load_tables(self, data_dir, batch_size, checkpoint, jobs, verbosity):
+        """Загружает таблицы, как только загружены все их зависимости."""
+        pending = table_dependencies(TABLES)
+        timings = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            while pending or running:
+                ready = [
+                    model for model, dependencies in pending.items()
+                    if not dependencies & (pending.keys() | running.keys())
+                ]
+                for model in ready[:jobs - len(running)]:
+                    del pending[model]
+                    csv_f = TABLES[model]
+                    future = executor.submit(
+                        self.load_table_in_thread, model,
+                        os.path.join(data_dir, csv_f), csv_f, batch_size,
+                        checkpoint, verbosity,
+                    )
+                    running[model] = future
+                if not running:
+                    raise CommandError('Циклическая зависимость таблиц.')
+                done, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+                for model, future in list(running.items()):
+                    if future in done:
+                        del running[model]
+                        timings[model] = future.result()
+        return timings
+
+    def load_table_in_thread(self, *args):
+        try:
+            return self.load_table(*args)
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
+
+    def load_table(self, model, path, csv_f, batch_size, checkpoint,
+                   verbosity):
+        loaded = checkpoint.get(csv_f)
+        counts = Counter(inserted=0, updated=0, unchanged=0)
+        started = time.monotonic()
+        with open(path, 'r', encoding='utf-8', newline='') as csv_file:
+            reader = csv.DictReader(csv_file)
+            fields = self.get_update_fields(model, reader.fieldnames)
+            dates = datetime_fields(model, reader.fieldnames)
+            for _ in islice(reader, loaded):
+                pass
+            skipped = loaded
+            while True:
+                batch = [
+                    model(**clean_row(data, dates))
+                    for data in islice(reader, batch_size)
+                ]
+                if not batch:
+                    break
+                with self.write_lock, transaction.atomic():
+                    counts.update(self.write_batch(model, batch, fields))
+                loaded += len(batch)
+                checkpoint.save(csv_f, loaded)
+                if verbosity > 1:
+                    self.report(csv_f, loaded - skipped, started)
+        return counts, time.monotonic() - started
+
+    def get_update_fields(self, model, header):
+        """Поля из заголовка csv, которые можно обновлять по id."""
+        fields = []
+        for name in header:
+            field = model._meta.get_field(name)
+            if field.primary_key or getattr(field, 'auto_now_add', False):
+                continue
+            fields.append(field)
+        return fields
+
+    def write_batch(self, model, batch, fields):
+        if self.mode == INSERT:
+            bulk_create_as_is(model, batch)
+            return {'inserted': len(batch)}
+        existing = model.objects.only(
+            *(field.attname for field in fields)
+        ).in_bulk([obj.pk for obj in batch])
+        created, changed = [], []
+        for obj in batch:
+            current = existing.get(obj._meta.pk.to_python(obj.pk))
+            if current is None:
+                created.append(obj)
+                continue
+            obj.pk = current.pk
+            if any(
+                field.to_python(getattr(obj, field.attname))
+                != getattr(current, field.attname)
+                for field in fields
+            ):
+                changed.append(obj)
+        bulk_create_as_is(model, created)
+        if changed and fields:
+            model.objects.bulk_update(
+                changed, [field.name for field in fields]
+            )
+            if model is User:
+                self.revoke_tokens(changed, existing, fields)
+        return {
+            'inserted': len(created),
+            'updated': len(changed),
+            'unchanged': len(batch) - len(created) - len(changed),
+        }
+
+    def revoke_tokens(self, changed, existing, fields):
+        """Отзывает токены пользователей, у которых сменились права.
+
+        bulk_update не вызывает User.save, где это происходит обычно.
+        """
+        fields = [field for field in fields if field.name in ACCESS_FIELDS]
+        for obj in changed:
+            current = existing[obj.pk]
+            if any(
+                field.to_python(getattr(obj, field.attname))
+                != getattr(current, field.attname)
+                for field in fields
+            ):
+                current.revoke_tokens()
+
+    def report(self, csv_f, rows, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{csv_f}: {rows} строк, {rows / elapsed:.0f} строк/с'
+        )
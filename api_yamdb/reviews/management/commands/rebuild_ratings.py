@@ -0,0 +1,24 @@
+from django.core.management import BaseCommand
+from reviews.models import Title
+from reviews.suggest import suggestions
+from reviews.versions import touch_all
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённый рейтинг произведений по отзывам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество произведений в одном запросе обновления.',
+        )
+
+    def handle(self, *args, **options):
+        changed = Title.rebuild_ratings(batch_size=options['batch_size'])
+        suggestions.invalidate()
+        touch_all()
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинг пересчитан, обновлено: {changed}')
+        )
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management import BaseCommand
+from reviews.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящей почты.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Сколько писем отправлять через одно соединение.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками очереди в режиме --loop.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_pending(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено: {sent}, с ошибкой: {failed}'
+                )
+            if sent + failed == options['batch_size']:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,44 @@
+# Generated by Django 3.2 on 2026-10-17 18:25
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    totals = Review.objects.order_by().values('title').annotate(
+        total=Sum('score'), count=Count('id')
+    )
+    for row in totals:
+        Title.objects.filter(pk=row['title']).update(
+            score_sum=row['total'],
+            score_count=row['count'],
+            rating=float(f"{row['total'] / row['count']:.2f}"),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from reviews.search import install_search_index, uninstall_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor.connection.alias, rebuild=True)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
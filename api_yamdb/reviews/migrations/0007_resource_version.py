@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-17 18:55
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_user_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResourceVersion',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Ключ')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Версия')),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Изменено')),
+            ],
+            options={
+                'verbose_name': 'Версия ресурса',
+                'verbose_name_plural': 'Версии ресурсов',
+            },
+        ),
+    ]
@@ -1,7 +1,8 @@
 from django.contrib.auth.models import AbstractUser, UserManager
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-from django.db.models import Avg
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
 
 USER = 'user'
 MODERATOR = 'moderator'
@@ -11,6 +12,17 @@ ROLES = (
     (MODERATOR, 'Moderator'),
     (ADMIN, 'Admin'),
 )
+# Поля, от которых зависят права: их смена отзывает выданные токены.
+ACCESS_FIELDS = ('role', 'is_staff', 'is_superuser')
+
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+MAIL_STATUSES = (
+    (PENDING, 'Ожидает отправки'),
+    (SENT, 'Отправлено'),
+    (FAILED, 'Не отправлено'),
+)
 
 
 class User(AbstractUser):
@@ -41,6 +53,11 @@ class User(AbstractUser):
         choices=ROLES,
         blank=True
     )
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0,
+        editable=False,
+    )
     object = UserManager()
 
     class Meta:
@@ -51,6 +68,47 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_username = instance.__dict__.get('username')
+        instance._loaded_access = instance.access_state()
+        return instance
+
+    def access_state(self):
+        """Загруженные значения полей `ACCESS_FIELDS`."""
+        return {
+            name: self.__dict__[name] for name in ACCESS_FIELDS
+            if name in self.__dict__
+        }
+
+    def access_changed(self, update_fields=None):
+        """Изменились ли права с момента загрузки из базы."""
+        loaded = getattr(self, '_loaded_access', None)
+        if loaded is None:
+            return False
+        names = ACCESS_FIELDS
+        if update_fields is not None:
+            names = [name for name in names if name in update_fields]
+        current = self.access_state()
+        return any(current.get(name) != loaded.get(name) for name in names)
+
+    def save(self, *args, **kwargs):
+        # Права меняют не только через API: админка, импорт и
+        # load_base тоже должны отзывать токены с прежней ролью.
+        update_fields = kwargs.get('update_fields')
+        if self.access_changed(update_fields):
+            self.token_version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._loaded_access = self.access_state()
+
+    def revoke_tokens(self):
+        """Делает недействительными выданные токены с прежней ролью."""
+        self.token_version += 1
+        self.save(update_fields=('token_version',))
+
 
 class Category(models.Model):
     name = models.CharField(
@@ -94,6 +152,10 @@ class Genre(models.Model):
         return self.name
 
 
+# Поля рейтинга, которые меняет каждый отзыв.
+RATING_FIELDS = ('score_sum', 'score_count', 'rating')
+
+
 class Title(models.Model):
     name = models.CharField(
         "Название произведения",
@@ -119,25 +181,91 @@ class Title(models.Model):
         through='GenreTitle'
     )
     description = models.TextField(blank=True, verbose_name='description')
+    score_sum = models.PositiveIntegerField(
+        "Сумма оценок",
+        default=0,
+        editable=False,
+    )
+    score_count = models.PositiveIntegerField(
+        "Количество оценок",
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        "Рейтинг",
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+    )
 
     class Meta:
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
         ordering = ["name"]
-
-    @property
-    def rating(self):
-        rating = self.reviews.aggregate(Avg('score'))['score__avg']
-        if rating:
-            return (
-                round(rating)
-                if isinstance(rating, int)
-                else float(f'{rating:.2f}')
-            )
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def calculate_rating(score_sum, score_count):
+        if score_count:
+            return float(f'{score_sum / score_count:.2f}')
+        return None
+
+    @classmethod
+    def shift_rating(cls, title_id, score_delta, count_delta):
+        """Сдвигает сумму и количество оценок произведения под блокировкой."""
+        with transaction.atomic():
+            title = (
+                cls.objects.select_for_update()
+                .filter(pk=title_id)
+                .only('name', 'score_sum', 'score_count', 'rating')
+                .first()
+            )
+            if title is None:
+                return
+            title.score_sum = max(title.score_sum + score_delta, 0)
+            title.score_count = max(title.score_count + count_delta, 0)
+            title.rating = cls.calculate_rating(
+                title.score_sum, title.score_count
+            )
+            title.save(update_fields=RATING_FIELDS)
+
+    @classmethod
+    def rebuild_ratings(cls, titles=None, batch_size=1000):
+        """Пересчитывает рейтинг произведений по таблице отзывов."""
+        if titles is None:
+            titles = cls.objects.all()
+        reviews = Review.objects.filter(title__in=titles.values('pk'))
+        totals = {
+            row['title']: (row['total'], row['count'])
+            for row in reviews.order_by().values('title').annotate(
+                total=Sum('score'), count=Count('id')
+            )
+        }
+        with transaction.atomic():
+            titles = titles.only('score_sum', 'score_count', 'rating')
+            changed = []
+            for title in titles.iterator(chunk_size=batch_size):
+                score_sum, score_count = totals.get(title.pk, (0, 0))
+                rating = cls.calculate_rating(score_sum, score_count)
+                if (title.score_sum, title.score_count, title.rating) == (
+                    score_sum, score_count, rating
+                ):
+                    continue
+                title.score_sum = score_sum
+                title.score_count = score_count
+                title.rating = rating
+                changed.append(title)
+            cls.objects.bulk_update(
+                changed, RATING_FIELDS, batch_size=batch_size
+            )
+        return len(changed)
+
 
 class GenreTitle(models.Model):
     genre = models.ForeignKey(
@@ -187,6 +315,12 @@ class Review(models.Model):
                 name='unique_author_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         ordering = ("-pub_date",)
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзыв"
@@ -194,6 +328,15 @@ class Review(models.Model):
     def __str__(self):
         return f'{self.text}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = (
+            instance.__dict__.get('title_id'),
+            instance.__dict__.get('score'),
+        )
+        return instance
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -218,6 +361,163 @@ class Comment(models.Model):
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
         ordering = ["pub_date"]
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.text}'
+
+
+class OutboxMessage(models.Model):
+    recipient = models.EmailField('Получатель', max_length=255)
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=MAIL_STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    send_after = models.DateTimeField('Отправить после', default=timezone.now)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('send_after', 'id')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipient'],
+                condition=Q(status=PENDING),
+                name='unique_pending_recipient'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['status', 'send_after'],
+                name='outbox_status_send_after_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
+
+    @classmethod
+    def enqueue(cls, recipient, subject, body):
+        """Ставит письмо в очередь.
+
+        Неотправленное письмо тому же получателю заменяется новым,
+        чтобы повторная регистрация не порождала дубликатов.
+        """
+        values = {
+            'subject': subject,
+            'body': body,
+            'attempts': 0,
+            'send_after': timezone.now(),
+            'last_error': '',
+        }
+        pending = cls.objects.filter(recipient=recipient, status=PENDING)
+        if pending.update(**values):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(recipient=recipient, **values)
+        except IntegrityError:
+            pending.update(**values)
+
+
+class ResourceVersion(models.Model):
+    """Счётчик изменений ресурса API для условных запросов."""
+
+    key = models.CharField('Ключ', max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField('Версия', default=0)
+    modified = models.DateTimeField('Изменено', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Версия ресурса'
+        verbose_name_plural = 'Версии ресурсов'
+
+    def __str__(self):
+        return f'{self.key}: {self.version}'
+
+    @classmethod
+    def bump(cls, *keys):
+        """Увеличивает версии ресурсов в текущей транзакции."""
+        now = timezone.now()
+        keys = list(dict.fromkeys(keys))
+        counters = cls.objects.filter(key__in=keys)
+        if not keys or counters.update(
+            version=F('version') + 1, modified=now
+        ) == len(keys):
+            return
+        # Обновлённые строки узнаются по метке времени этого вызова.
+        updated = set(
+            counters.filter(modified=now).values_list('key', flat=True)
+        )
+        for key in keys:
+            if key in updated:
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(key=key, version=1, modified=now)
+            except IntegrityError:
+                cls.objects.filter(key=key).update(
+                    version=F('version') + 1, modified=now
+                )
+
+    @classmethod
+    def bump_on_commit(cls, *keys):
+        """Увеличивает версии после фиксации текущей транзакции.
+
+        Для общих счётчиков, которые меняет почти каждая запись: строка
+        счётчика блокируется на одно обновление, а не до конца чужой
+        транзакции.
+        """
+        transaction.on_commit(lambda: cls.bump(*keys))
+
+    @classmethod
+    def get_many(cls, keys):
+        """Словарь ключ → (версия, время изменения) за один запрос."""
+        return {
+            key: (version, modified)
+            for key, version, modified in cls.objects.filter(
+                key__in=keys
+            ).values_list('key', 'version', 'modified')
+        }
+
+
+def bulk_create_as_is(model, objs, batch_size=1000):
+    """bulk_create, сохраняющий заданные значения полей auto_now_add.
+
+    bulk_create заполняет такие поля текущим временем, поэтому заданные
+    значения (даты из csv или синтетического набора) записываются
+    отдельным bulk_update после вставки.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    given = [
+        {
+            field.attname: getattr(obj, field.attname) for field in fields
+            if getattr(obj, field.attname) is not None
+        }
+        for obj in objs
+    ]
+    model.objects.bulk_create(objs, batch_size=batch_size)
+    for obj, values in zip(objs, given):
+        for name, value in values.items():
+            setattr(obj, name, value)
+    restored = [obj for obj, values in zip(objs, given) if values]
+    if restored:
+        model.objects.bulk_update(
+            restored, [field.name for field in fields],
+            batch_size=batch_size,
+        )
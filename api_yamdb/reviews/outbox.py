@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import FAILED, PENDING, SENT, OutboxMessage
+
+
+def retry_delay(attempts):
+    delay = settings.MAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.MAIL_QUEUE_MAX_DELAY))
+
+
+def mark_failed(message, error):
+    message.last_error = f'{type(error).__name__}: {error}'
+    if message.attempts >= settings.MAIL_QUEUE_MAX_ATTEMPTS:
+        message.status = FAILED
+    else:
+        message.send_after = timezone.now() + retry_delay(message.attempts)
+
+
+def send_messages(messages):
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        for message in messages:
+            mark_failed(message, error)
+        return
+    try:
+        for message in messages:
+            try:
+                EmailMessage(
+                    message.subject,
+                    message.body,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [message.recipient],
+                    connection=connection,
+                ).send()
+            except Exception as error:
+                mark_failed(message, error)
+            else:
+                message.status = SENT
+                message.sent_at = timezone.now()
+                message.last_error = ''
+    finally:
+        connection.close()
+
+
+def claim_batch(batch_size):
+    """Забирает пачку писем на `MAIL_QUEUE_LEASE` секунд.
+
+    Срок отправки сдвигается вперёд, поэтому другие воркеры не возьмут
+    эти письма, пока идёт отправка, а после падения воркера письма
+    вернутся в очередь сами.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status=PENDING, send_after__lte=now)
+            .order_by('send_after', 'id')[:batch_size]
+        )
+        for message in messages:
+            message.attempts += 1
+            message.send_after = now + timedelta(
+                seconds=settings.MAIL_QUEUE_LEASE
+            )
+        OutboxMessage.objects.bulk_update(
+            messages, ('attempts', 'send_after')
+        )
+    return messages
+
+
+def deliver_pending(batch_size=100):
+    """Отправляет одну пачку писем, срок отправки которых наступил.
+
+    Все письма пачки уходят через одно соединение с почтовым сервером.
+    Отправка идёт вне транзакции: блокировки держатся только пока
+    пачка забирается и пока записывается результат.
+    Неудачные попытки откладываются с экспоненциально растущей паузой,
+    после `MAIL_QUEUE_MAX_ATTEMPTS` попыток письмо помечается неотправленным.
+    Возвращает количество отправленных и неотправленных писем.
+    """
+    messages = claim_batch(batch_size)
+    if not messages:
+        return 0, 0
+    send_messages(messages)
+    with transaction.atomic():
+        OutboxMessage.objects.filter(status=PENDING).bulk_update(
+            messages, ('status', 'send_after', 'sent_at', 'last_error'),
+        )
+    sent = sum(message.status == SENT for message in messages)
+    return sent, len(messages) - sent
@@ -0,0 +1,121 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+FTS_TABLE = 'reviews_title_fts'
+
+SQLITE_INSTALL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    "name, description, content='reviews_title', content_rowid='id')",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai '
+    'AFTER INSERT ON reviews_title BEGIN '
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad '
+    'AFTER DELETE ON reviews_title BEGIN '
+    f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au '
+    'AFTER UPDATE OF name, description ON reviews_title BEGIN '
+    f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+)
+SQLITE_REBUILD = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+SQLITE_UNINSTALL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+POSTGRES_DOCUMENT = (
+    "to_tsvector('simple', coalesce(name, '') || ' ' "
+    "|| coalesce(description, ''))"
+)
+POSTGRES_INSTALL = (
+    'CREATE INDEX IF NOT EXISTS reviews_title_search_idx '
+    f'ON reviews_title USING gin ({POSTGRES_DOCUMENT})',
+)
+POSTGRES_UNINSTALL = ('DROP INDEX IF EXISTS reviews_title_search_idx',)
+
+WORD = re.compile(r'\w+')
+
+
+def sqlite_has_index(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [FTS_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def install_search_index(using='default', rebuild=False):
+    """Создаёт полнотекстовый индекс по name и description произведений.
+
+    В SQLite это внешняя таблица FTS5 с триггерами синхронизации,
+    в PostgreSQL — GIN-индекс по tsvector. Повторный вызов безопасен.
+    """
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        rebuild = rebuild or not sqlite_has_index(connection)
+        statements = SQLITE_INSTALL + ((SQLITE_REBUILD,) if rebuild else ())
+    elif connection.vendor == 'postgresql':
+        statements = POSTGRES_INSTALL
+    else:
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def uninstall_search_index(using='default'):
+    connection = connections[using]
+    statements = {
+        'sqlite': SQLITE_UNINSTALL,
+        'postgresql': POSTGRES_UNINSTALL,
+    }.get(connection.vendor, ())
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def search_titles(queryset, query):
+    """Отбирает произведения по запросу и сортирует их по релевантности."""
+    words = WORD.findall(query)
+    if not words:
+        return queryset.none()
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{word}"' for word in words[:-1])
+        match = f'{match} "{words[-1]}"*'.strip()
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[
+                f'{FTS_TABLE}.rowid = reviews_title.id',
+                f'{FTS_TABLE} MATCH %s',
+            ],
+            params=[match],
+            select={'search_rank': f'{FTS_TABLE}.rank'},
+            order_by=['search_rank', 'id'],
+        )
+    if vendor == 'postgresql':
+        match = ' & '.join(f"'{word}'" for word in words[:-1])
+        match = f"{match} & '{words[-1]}':*".lstrip(' &')
+        return queryset.extra(
+            select={'search_rank': (
+                f'ts_rank({POSTGRES_DOCUMENT}, '
+                "to_tsquery('simple', %s))"
+            )},
+            select_params=[match],
+            where=[f"{POSTGRES_DOCUMENT} @@ to_tsquery('simple', %s)"],
+            params=[match],
+            order_by=['-search_rank', 'id'],
+        )
+    condition = Q()
+    for word in words:
+        condition &= Q(name__icontains=word) | Q(description__icontains=word)
+    return queryset.filter(condition)
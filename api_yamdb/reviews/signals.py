@@ -0,0 +1,233 @@
+import threading
+from collections import Counter
+
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from .catalog import CATALOGS
+from .models import (RATING_FIELDS, Category, Comment, Genre, GenreTitle,
+                     ResourceVersion, Review, Title, User)
+from .suggest import suggestions
+from .versions import (ALL, AUTHORS, CATEGORIES, GENRES, TITLES,
+                       comments_key, reviews_key, title_key)
+
+
+class Deleting(threading.local):
+    """Объекты, удаляемые каскадом в текущем потоке.
+
+    Отзывы и комментарии удаляемого произведения, отзыва или автора
+    не пересчитывают рейтинг и не сдвигают версии по одному: это
+    делается один раз при удалении родителя. Review.title допускает
+    NULL, поэтому произведение может удалиться раньше своих отзывов:
+    отметка снимается, когда удалены и оно, и все его отзывы.
+    """
+
+    def __init__(self):
+        self.titles = {}
+        self.reviews = set()
+        self.review_titles = Counter()
+        self.authors = {}
+
+    def add_review(self, review):
+        self.reviews.add(review.pk)
+        self.review_titles[review.title_id] += 1
+
+    def discard_review(self, review):
+        self.reviews.discard(review.pk)
+        self.review_titles[review.title_id] -= 1
+        if self.review_titles[review.title_id] <= 0:
+            del self.review_titles[review.title_id]
+            self.release_title(review.title_id)
+
+    def release_title(self, title_id):
+        if (
+            self.titles.get(title_id)
+            and title_id not in self.review_titles
+        ):
+            del self.titles[title_id]
+
+
+deleting = Deleting()
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_title_id, old_score = getattr(instance, '_loaded_score', (None, None))
+    if created:
+        Title.shift_rating(instance.title_id, instance.score, 1)
+    elif old_title_id is None:
+        # bulk_update не отправляет сигналов, версию сдвигаем сами.
+        Title.rebuild_ratings(Title.objects.filter(pk=instance.title_id))
+        ResourceVersion.bump(title_key(instance.title_id))
+        ResourceVersion.bump_on_commit(TITLES)
+    elif old_title_id != instance.title_id:
+        Title.shift_rating(old_title_id, -old_score, -1)
+        ResourceVersion.bump(reviews_key(old_title_id))
+        Title.shift_rating(instance.title_id, instance.score, 1)
+    elif old_score != instance.score:
+        Title.shift_rating(instance.title_id, instance.score - old_score, 0)
+    instance._loaded_score = (instance.title_id, instance.score)
+
+
+@receiver(pre_delete, sender=Review)
+def review_deleting(sender, instance, **kwargs):
+    deleting.add_review(instance)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    cascade = (
+        instance.title_id in deleting.titles
+        or instance.author_id in deleting.authors
+    )
+    deleting.discard_review(instance)
+    if cascade:
+        return
+    old_title_id, old_score = getattr(
+        instance, '_loaded_score', (instance.title_id, instance.score)
+    )
+    Title.shift_rating(old_title_id, -old_score, -1)
+    ResourceVersion.bump(reviews_key(old_title_id))
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleting(sender, instance, **kwargs):
+    deleting.titles[instance.pk] = False
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    deleting.titles[instance.pk] = True
+    deleting.release_title(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def author_deleting(sender, instance, **kwargs):
+    deleting.authors[instance.pk] = (
+        set(Review.objects.filter(author_id=instance.pk)
+            .order_by().values_list('title_id', flat=True)),
+        set(Comment.objects.filter(author_id=instance.pk)
+            .order_by().values_list('review_id', flat=True)),
+    )
+
+
+@receiver(post_delete, sender=User)
+def author_deleted(sender, instance, **kwargs):
+    # Отзывы и комментарии показывают имя автора.
+    title_ids, review_ids = deleting.authors.pop(
+        instance.pk, (set(), set())
+    )
+    keys = [AUTHORS, *map(comments_key, review_ids)]
+    if title_ids:
+        titles = Title.objects.filter(pk__in=title_ids)
+        Title.rebuild_ratings(titles)
+        for title in titles.only('name', 'rating'):
+            suggestions.update(title)
+        keys += [TITLES, *map(title_key, title_ids)]
+        keys += map(reviews_key, title_ids)
+    ResourceVersion.bump(*keys)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def catalog_changed(sender, **kwargs):
+    CATALOGS[sender].invalidate_on_commit()
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def suggestion_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        suggestions.update(instance)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def suggestion_deleted(sender, instance, **kwargs):
+    suggestions.update(instance, deleted=True)
+
+
+# Версии ресурсов для условных запросов. Рейтинг произведения
+# меняется через Title.save, поэтому отзывы сдвигают только свой список.
+@receiver(post_save, sender=Review)
+def review_version(sender, instance, **kwargs):
+    ResourceVersion.bump(reviews_key(instance.title_id))
+
+
+@receiver(post_save, sender=Comment)
+def comment_version(sender, instance, **kwargs):
+    ResourceVersion.bump(comments_key(instance.review_id))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted_version(sender, instance, **kwargs):
+    if (
+        instance.review_id in deleting.reviews
+        or instance.author_id in deleting.authors
+    ):
+        return
+    ResourceVersion.bump(comments_key(instance.review_id))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def title_version(sender, instance, update_fields=None, **kwargs):
+    if update_fields and update_fields <= set(RATING_FIELDS):
+        # Рейтинг сдвигает каждый отзыв: общий счётчик списка
+        # увеличивается после фиксации, иначе записи отзывов ко всем
+        # произведениям ждали бы друг друга на его строке.
+        ResourceVersion.bump(title_key(instance.pk))
+        ResourceVersion.bump_on_commit(TITLES)
+        return
+    ResourceVersion.bump(TITLES, title_key(instance.pk))
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def genre_title_version(sender, instance, **kwargs):
+    if instance.title_id not in deleting.titles:
+        ResourceVersion.bump(TITLES, title_key(instance.title_id))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_version(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        ResourceVersion.bump(TITLES, title_key(instance.pk))
+    elif pk_set is None:
+        ResourceVersion.bump(ALL)
+    else:
+        ResourceVersion.bump(TITLES, *map(title_key, pk_set))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_version(sender, **kwargs):
+    ResourceVersion.bump(CATEGORIES, TITLES)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_version(sender, **kwargs):
+    ResourceVersion.bump(GENRES, TITLES)
+
+
+@receiver(post_save, sender=User)
+def author_version(sender, instance, created, update_fields, **kwargs):
+    # Отзывы и комментарии показывают только имя автора: вход, отзыв
+    # токенов и регистрация не должны сбрасывать их валидаторы.
+    loaded = getattr(instance, '_loaded_username', None)
+    instance._loaded_username = instance.username
+    if created or update_fields and 'username' not in update_fields:
+        return
+    if loaded != instance.username:
+        ResourceVersion.bump(AUTHORS)
@@ -0,0 +1,267 @@
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import chain
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .models import Category, Genre, Title
+
+WORD_START = re.compile(r'\b\w')
+KEY_END = '\U0010ffff'
+
+
+def normalize(text):
+    return text.casefold().replace('ё', 'е')
+
+
+class PrefixIndex:
+    """Отсортированный список ключей для поиска по началу слова.
+
+    Ключом служит каждый хвост названия, начинающийся с начала слова,
+    поэтому «шоу» находит «Побег из Шоушенка». Для коротких префиксов
+    с большим числом совпадений запоминаются `top_size` лучших записей
+    и граница: все остальные совпадения не лучше неё. Изменения
+    записей правят эти списки на месте; префикс сканируется заново,
+    только если в списке осталось меньше записей, чем запрошено.
+    Поиск и изменения выполняются под блокировкой индекса.
+    """
+    scan_limit = 512
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []
+        self._entries = {}
+        self._top = {}
+
+    @property
+    def top_size(self):
+        return 2 * settings.SUGGEST_MAX_LIMIT
+
+    @classmethod
+    def build(cls, rows):
+        """Индекс из строк (pk, name, rank, data) одной сортировкой."""
+        index = cls()
+        for pk, name, rank, data in rows:
+            index._entries[pk] = (index._entry_keys(pk, name), rank, data)
+        index._keys = sorted(chain.from_iterable(
+            keys for keys, _, _ in index._entries.values()
+        ))
+        return index
+
+    def _entry_keys(self, pk, name):
+        text = normalize(name)
+        return {
+            (text[match.start():], pk) for match in WORD_START.finditer(text)
+        }
+
+    def add(self, pk, name, rank, data):
+        with self._lock:
+            old_keys = self._remove_keys(pk)
+            keys = self._entry_keys(pk, name)
+            self._entries[pk] = (keys, rank, data)
+            for key in keys:
+                insort(self._keys, key)
+            self._update_tops(pk, old_keys | keys, keys, rank)
+
+    def remove(self, pk):
+        with self._lock:
+            old_keys = self._remove_keys(pk)
+            self._update_tops(pk, old_keys, (), None)
+
+    def _remove_keys(self, pk):
+        entry = self._entries.pop(pk, None)
+        if entry is None:
+            return set()
+        for key in entry[0]:
+            position = bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+        return entry[0]
+
+    def _update_tops(self, pk, touched, keys, rank):
+        """Переносит запись `pk` в списках лучших затронутых префиксов."""
+        for prefix, (bound, items) in list(self._top.items()):
+            if not any(key.startswith(prefix) for key, _ in touched):
+                continue
+            items = [item for item in items if item[1] != pk]
+            item = (rank, pk)
+            if any(key.startswith(prefix) for key, _ in keys) and (
+                bound is None or item <= bound
+            ):
+                insort(items, item)
+                if len(items) > self.top_size:
+                    del items[self.top_size:]
+                    bound = items[-1]
+            self._top[prefix] = (bound, items)
+
+    def search(self, prefix, limit):
+        prefix = normalize(prefix)
+        with self._lock:
+            return self._search(prefix, limit)
+
+    def _search(self, prefix, limit):
+        top = self._top.get(prefix)
+        if top is None or len(top[1]) < limit and top[0] is not None:
+            top = self._scan(prefix, limit)
+        return [self._entries[pk][2] for _, pk in top[1][:limit]]
+
+    def _scan(self, prefix, limit):
+        low = bisect_left(self._keys, (prefix,))
+        high = bisect_left(self._keys, (prefix + KEY_END,))
+        found = {pk for _, pk in self._keys[low:high]}
+        size = max(limit, self.top_size)
+        items = heapq.nsmallest(
+            size, ((self._entries[pk][1], pk) for pk in found)
+        )
+        # None — в списке все совпадения с префиксом.
+        top = (items[-1] if len(items) == size else None, items)
+        if high - low > self.scan_limit:
+            self._top[prefix] = top
+        return top
+
+
+def title_rank(name, rating):
+    return (-(rating or 0), normalize(name))
+
+
+def title_data(pk, name, rating):
+    return {
+        'id': pk,
+        'name': name,
+        'rating': int(rating) if rating is not None else None,
+    }
+
+
+def catalog_rank(name, slug):
+    return (normalize(name), slug)
+
+
+def catalog_data(pk, name, slug):
+    return {'name': name, 'slug': slug}
+
+
+class Suggestions:
+    """Индексы подсказок по произведениям, жанрам и категориям.
+
+    Строятся в памяти процесса при первом обращении, обновляются
+    сигналами моделей и полностью перестраиваются раз в
+    `SUGGEST_TIMEOUT` секунд, чтобы подхватить изменения из других
+    процессов. Перестроение идёт в фоновом потоке, запросы тем
+    временем отвечают по прежним индексам; новые индексы подменяют
+    их целиком, а изменения, пришедшие во время перестроения,
+    переносятся в них.
+    """
+    sources = {
+        'titles': (Title, ('id', 'name', 'rating'), title_rank, title_data),
+        'genres': (Genre, ('id', 'name', 'slug'), catalog_rank, catalog_data),
+        'categories': (
+            Category, ('id', 'name', 'slug'), catalog_rank, catalog_data
+        ),
+    }
+    kinds = {Title: 'titles', Genre: 'genres', Category: 'categories'}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._indexes = None
+        self._expires = 0
+        self._generation = 0
+        self._pending = None
+        self._rebuild_thread = None
+
+    def _build(self):
+        indexes = {}
+        for kind, (model, fields, rank, data) in self.sources.items():
+            rows = model.objects.order_by().values_list(*fields)
+            indexes[kind] = PrefixIndex.build(
+                (row[0], row[1], rank(*row[1:]), data(*row))
+                for row in rows.iterator()
+            )
+        return indexes
+
+    def _refresh(self):
+        with self._lock:
+            self._pending = []
+            generation = self._generation
+        try:
+            indexes = self._build()
+            with self._lock:
+                if generation != self._generation:
+                    return
+                for kind, pk, row in self._pending:
+                    self._apply_to(indexes, kind, pk, row)
+                self._indexes = indexes
+                self._expires = time.monotonic() + settings.SUGGEST_TIMEOUT
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def _ensure_loaded(self):
+        while True:
+            indexes = self._indexes
+            if indexes is not None:
+                if time.monotonic() >= self._expires:
+                    self._start_rebuild()
+                return indexes
+            # Пока индексов нет, запрос ждёт их построения.
+            with self._build_lock:
+                if self._indexes is None:
+                    self._refresh()
+
+    def _start_rebuild(self):
+        """Перестраивает индексы в фоне, если этим никто не занят."""
+        if not self._build_lock.acquire(blocking=False):
+            return
+        try:
+            self._rebuild_thread = threading.Thread(
+                target=self._rebuild, name='suggest-rebuild', daemon=True
+            )
+            self._rebuild_thread.start()
+        except Exception:
+            self._build_lock.release()
+            raise
+
+    def _rebuild(self):
+        try:
+            self._refresh()
+        finally:
+            connections.close_all()
+            self._build_lock.release()
+
+    def search(self, prefix, kinds, limit):
+        indexes = self._ensure_loaded()
+        return {kind: indexes[kind].search(prefix, limit) for kind in kinds}
+
+    def _apply_to(self, indexes, kind, pk, row):
+        index = indexes[kind]
+        if row is None:
+            index.remove(pk)
+            return
+        _, _, rank, data = self.sources[kind]
+        index.add(pk, row[0], rank(*row), data(pk, *row))
+
+    def _apply(self, kind, pk, row):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((kind, pk, row))
+            if self._indexes is not None:
+                self._apply_to(self._indexes, kind, pk, row)
+
+    def update(self, instance, deleted=False):
+        kind = self.kinds[type(instance)]
+        fields = self.sources[kind][1][1:]
+        row = None if deleted else [getattr(instance, f) for f in fields]
+        pk = instance.pk
+        transaction.on_commit(lambda: self._apply(kind, pk, row))
+
+    def invalidate(self):
+        with self._lock:
+            self._indexes = None
+            self._generation += 1
+
+
+suggestions = Suggestions()
@@ -0,0 +1,286 @@
+import random
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import django
+from django.db import transaction
+from django.db.models import Max
+
+from .models import (ADMIN, MODERATOR, USER, Category, Comment, Genre,
+                     GenreTitle, Review, Title, User, bulk_create_as_is)
+
+WORDS = (
+    'время', 'жизнь', 'дорога', 'город', 'ночь', 'море', 'война', 'мир',
+    'песня', 'тайна', 'история', 'лето', 'звезда', 'сердце', 'дом', 'путь',
+    'свет', 'тень', 'река', 'ветер', 'огонь', 'зима', 'память', 'друг',
+)
+ROLE_WEIGHTS = ((USER, 0.94), (MODERATOR, 0.05), (ADMIN, 0.01))
+# Оценки смещены к высоким, как в реальных каталогах.
+SCORE_WEIGHTS = (1, 1, 2, 3, 5, 7, 10, 14, 12, 9)
+GENRES_PER_TITLE = (1, 1, 1, 2, 2, 3)
+FIRST_PUB_DATE = datetime(2010, 1, 1, tzinfo=timezone.utc)
+PUB_DATE_SPAN = timedelta(days=13 * 365).total_seconds()
+# Столбцы строк, совпадающие с заголовками csv-файлов load_base.
+FIELDS = {
+    Category: ('id', 'name', 'slug'),
+    Genre: ('id', 'name', 'slug'),
+    Title: ('id', 'name', 'year', 'category_id', 'description'),
+    GenreTitle: ('id', 'title_id', 'genre_id'),
+    User: ('id', 'username', 'email', 'role', 'bio', 'first_name',
+           'last_name'),
+    Review: ('id', 'title_id', 'text', 'author_id', 'score', 'pub_date'),
+    Comment: ('id', 'review_id', 'text', 'author_id', 'pub_date'),
+}
+MODELS = tuple(FIELDS)
+
+
+def zipf_weights(count, exponent):
+    return [1 / rank ** exponent for rank in range(1, count + 1)]
+
+
+def split_total(total, weights, cap):
+    """Делит `total` пропорционально весам, не больше `cap` на долю."""
+    scale = total / sum(weights)
+    counts = [min(int(weight * scale), cap) for weight in weights]
+    rest = total - sum(counts)
+    while rest > 0:
+        added = 0
+        for index, count in enumerate(counts):
+            if rest == added:
+                break
+            if count < cap:
+                counts[index] += 1
+                added += 1
+        if not added:
+            break
+        rest -= added
+    return counts
+
+
+def text(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words))
+
+
+def pub_date(rng):
+    return (
+        FIRST_PUB_DATE + timedelta(seconds=rng.random() * PUB_DATE_SPAN)
+    ).isoformat()
+
+
+def generate_shard(shard):
+    """Отзывы и комментарии к части произведений.
+
+    Работает без обращения к базе, чтобы выполняться в отдельном
+    процессе; у каждой части свой генератор случайных чисел, поэтому
+    результат не зависит от числа процессов.
+    """
+    (seed, index, titles, counts, users, review_id, comment_id,
+     comments_left, comments_per_review) = shard
+    rng = random.Random(f'{seed}:{index}')
+    users = range(*users)
+    reviews, comments = [], []
+    for title, count in zip(titles, counts):
+        for author in rng.sample(users, count):
+            reviews.append({
+                'id': review_id,
+                'title_id': title,
+                'text': text(rng, rng.randint(5, 30)),
+                'author_id': author,
+                'score': rng.choices(range(1, 11), SCORE_WEIGHTS)[0],
+                'pub_date': pub_date(rng),
+            })
+            # Среднее Парето(1.5) - 1 равно 2.
+            replies = min(
+                int(
+                    (rng.paretovariate(1.5) - 1) * comments_per_review / 2
+                    + rng.random()
+                ),
+                comments_left,
+            )
+            comments_left -= replies
+            for _ in range(replies):
+                comments.append({
+                    'id': comment_id,
+                    'review_id': review_id,
+                    'text': text(rng, rng.randint(3, 15)),
+                    'author_id': rng.choice(users),
+                    'pub_date': pub_date(rng),
+                })
+                comment_id += 1
+            review_id += 1
+    return reviews, comments
+
+
+def bounded_map(pool, func, items, window):
+    """Результаты `func` по порядку, не больше `window` частей в работе.
+
+    В отличие от `pool.map`, не отправляет все задания сразу, поэтому
+    готовые, но ещё не записанные части не копятся в памяти.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class Dataset:
+    """Синтетический набор данных с распределениями реального каталога.
+
+    Отзывы распределены по произведениям по закону Ципфа (одно
+    произведение — не больше одного отзыва автора), комментарии —
+    с тяжёлым хвостом по Парето, жанры произведения выбираются
+    с перекосом к популярным. Идентификаторы назначаются явно,
+    начиная с `first_ids` (по умолчанию — следующих за максимальными
+    в базе). Отзывы и комментарии генерируются частями примерно по
+    `shard_size` отзывов. Одинаковый `seed` даёт одинаковые данные
+    при любом `jobs`.
+    """
+
+    def __init__(self, titles, users, reviews, comments, categories=10,
+                 genres=30, seed=0, exponent=1.1, shard_size=20000):
+        self.sizes = {
+            Category: categories,
+            Genre: genres,
+            Title: titles,
+            User: users,
+        }
+        self.reviews = min(reviews, titles * users)
+        self.comments = comments
+        self.seed = seed
+        self.exponent = exponent
+        self.shard_size = shard_size
+
+    @staticmethod
+    def next_ids():
+        return {
+            model: (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+            for model in MODELS
+        }
+
+    def ranges(self, first_ids):
+        return {
+            model: range(first_ids[model], first_ids[model] + size)
+            for model, size in self.sizes.items()
+        }
+
+    def rows(self, first_ids=None, jobs=1):
+        """Пары (модель, список строк) в порядке зависимостей таблиц."""
+        if first_ids is None:
+            first_ids = self.next_ids()
+        rng = random.Random(self.seed)
+        ids = self.ranges(first_ids)
+        yield Category, [
+            {'id': pk, 'name': f'Категория {pk}', 'slug': f'category-{pk}'}
+            for pk in ids[Category]
+        ]
+        yield Genre, [
+            {'id': pk, 'name': f'Жанр {pk}', 'slug': f'genre-{pk}'}
+            for pk in ids[Genre]
+        ]
+        yield Title, [
+            {
+                'id': pk,
+                'name': text(rng, rng.randint(1, 4)).capitalize(),
+                'year': rng.randint(1900, 2023),
+                'category_id': rng.choice(ids[Category]),
+                'description': text(rng, 12),
+            }
+            for pk in ids[Title]
+        ]
+        yield GenreTitle, self.genre_titles(rng, first_ids[GenreTitle], ids)
+        roles, weights = zip(*ROLE_WEIGHTS)
+        yield User, [
+            {
+                'id': pk,
+                'username': f'synthetic{pk}',
+                'email': f'synthetic{pk}@example.com',
+                'role': rng.choices(roles, weights)[0],
+                'bio': '',
+                'first_name': '',
+                'last_name': '',
+            }
+            for pk in ids[User]
+        ]
+        shards = self.shards(rng, first_ids, ids)
+        if jobs > 1:
+            with ProcessPoolExecutor(jobs, initializer=django.setup) as pool:
+                yield from self.shard_rows(
+                    bounded_map(pool, generate_shard, shards, jobs * 2)
+                )
+        else:
+            yield from self.shard_rows(map(generate_shard, shards))
+
+    def genre_titles(self, rng, pk, ids):
+        genres = ids[Genre]
+        weights = zipf_weights(len(genres), 1)
+        rows = []
+        for title in ids[Title]:
+            count = min(rng.choice(GENRES_PER_TITLE), len(genres))
+            chosen = set()
+            while len(chosen) < count:
+                chosen.add(rng.choices(genres, weights)[0])
+            for genre in sorted(chosen):
+                rows.append({'id': pk, 'title_id': title, 'genre_id': genre})
+                pk += 1
+        return rows
+
+    def shards(self, rng, first_ids, ids):
+        """Задания для `generate_shard` с заранее известными диапазонами id."""
+        popularity = list(ids[Title])
+        rng.shuffle(popularity)
+        per_title = split_total(
+            self.reviews,
+            zipf_weights(len(popularity), self.exponent),
+            len(ids[User]),
+        )
+        # Части режутся по числу отзывов, а не произведений: иначе по
+        # закону Ципфа почти все отзывы попали бы в первую часть.
+        bounds, reviews = [0], 0
+        for index, count in enumerate(per_title, 1):
+            reviews += count
+            if reviews >= self.shard_size and index < len(per_title):
+                bounds.append(index)
+                reviews = 0
+        bounds.append(len(per_title))
+        parts = list(zip(bounds, bounds[1:]))
+        per_shard = [sum(per_title[start:end]) for start, end in parts]
+        comment_budgets = split_total(
+            self.comments, [count + 1 for count in per_shard], self.comments
+        )
+        comments_per_review = self.comments / max(self.reviews, 1)
+        review_id, comment_id = first_ids[Review], first_ids[Comment]
+        shards = []
+        for index, (start, end) in enumerate(parts):
+            shards.append((
+                self.seed, index, popularity[start:end],
+                per_title[start:end],
+                (ids[User].start, ids[User].stop),
+                review_id, comment_id, comment_budgets[index],
+                comments_per_review,
+            ))
+            review_id += per_shard[index]
+            comment_id += comment_budgets[index]
+        return shards
+
+    def shard_rows(self, results):
+        for reviews, comments in results:
+            yield Review, reviews
+            yield Comment, comments
+
+    def save(self, batch_size=5000, jobs=1):
+        """Записывает набор в базу и возвращает число строк по моделям."""
+        counts = Counter()
+        for model, rows in self.rows(jobs=jobs):
+            for start in range(0, len(rows), batch_size):
+                batch = [
+                    model(**row) for row in rows[start:start + batch_size]
+                ]
+                with transaction.atomic():
+                    bulk_create_as_is(model, batch)
+            counts[model] += len(rows)
+        Title.rebuild_ratings()
+        return counts
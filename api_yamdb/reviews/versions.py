@@ -0,0 +1,29 @@
+"""Ключи счётчиков `ResourceVersion`.
+
+Версия `ALL` входит в валидатор любого ресурса и увеличивается
+после массовых изменений в обход сигналов (load_base, generate_data,
+rebuild_ratings).
+"""
+from .models import ResourceVersion
+
+ALL = '*'
+CATEGORIES = 'categories'
+GENRES = 'genres'
+TITLES = 'titles'
+AUTHORS = 'authors'
+
+
+def title_key(title_id):
+    return f'title:{title_id}'
+
+
+def reviews_key(title_id):
+    return f'reviews:{title_id}'
+
+
+def comments_key(review_id):
+    return f'comments:{review_id}'
+
+
+def touch_all():
+    ResourceVersion.bump(ALL)
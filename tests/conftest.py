@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,4 +33,21 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_catalog',
 ]
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--benchmark', action='store_true',
+        help='Запускать тесты с меткой benchmark.',
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason='Замеры запускаются с --benchmark.')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
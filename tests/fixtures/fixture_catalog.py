@@ -0,0 +1,20 @@
+import pytest
+
+
+def invalidate_caches():
+    from django.core.cache import caches
+    from reviews.catalog import CATALOGS
+    from reviews.suggest import suggestions
+
+    for cache in caches.all():
+        cache.clear()
+    for catalog in CATALOGS.values():
+        catalog.invalidate()
+    suggestions.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    invalidate_caches()
+    yield
+    invalidate_caches()
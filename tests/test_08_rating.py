@@ -0,0 +1,54 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client,
+                                       moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review = create_single_review(
+            user_client, titles[0]['id'], 'первый', 3
+        ).json()
+        create_single_review(moderator_client, titles[0]['id'], 'второй', 8)
+        assert admin_client.get(url).json()['rating'] == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при создании отзыва.'
+        )
+
+        response = user_client.patch(
+            f'{url}reviews/{review["id"]}/', data={'score': 10}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert admin_client.get(url).json()['rating'] == 9, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при изменении оценки в отзыве.'
+        )
+
+        response = user_client.delete(f'{url}reviews/{review["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(url).json()['rating'] == 8, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при удалении отзыва.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'отзыв', 7)
+        Title.objects.update(score_sum=0, score_count=0, rating=None)
+
+        call_command('rebuild_ratings')
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.score_count, title.rating) == (
+            7, 1, 7.0
+        ), 'Проверьте, что команда `rebuild_ratings` восстанавливает рейтинг.'
+        assert Title.objects.get(pk=titles[1]['id']).rating is None
@@ -0,0 +1,170 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (check_query_budget, create_comments,
+                         create_single_review, create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    def test_01_titles_read_budget(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'отзыв', 6)
+
+        response = check_query_budget(client, '/api/v1/titles/', 4)
+        assert len(response.json()['results']) == len(titles)
+        check_query_budget(client, f'/api/v1/titles/{titles[0]["id"]}/', 3)
+
+    def test_02_reviews_and_comments_budget(self, client, admin_client,
+                                            admin, user, user_client):
+        authors_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, authors_map)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+
+        check_query_budget(client, f'/api/v1/titles/{title_id}/reviews/', 4)
+        check_query_budget(
+            client,
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            4
+        )
+
+    def test_03_catalog_lookups(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        url = (
+            f'/api/v1/titles/?genre={genres[0]["slug"].upper()}'
+            f'&category={categories[0]["slug"]}'
+        )
+        client.get(url)
+        response = check_query_budget(client, url, 4)
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[0]['id']
+        ], (
+            'Проверьте, что фильтрация `/api/v1/titles/` по slug жанра и '
+            'категории работает без учёта регистра.'
+        )
+
+        admin_client.delete(f'/api/v1/genres/{genres[0]["slug"]}/')
+        response = client.get(f'/api/v1/titles/?genre={genres[0]["slug"]}')
+        assert response.json()['results'] == [], (
+            'Проверьте, что справочник жанров сбрасывается при удалении жанра.'
+        )
+
+    def other_worker(self, change):
+        """Изменение в базе, о котором справочники процесса не узнали."""
+        from reviews.catalog import CATALOGS
+
+        states = [
+            (catalog, catalog.__dict__.copy()) for catalog in CATALOGS.values()
+        ]
+        change()
+        for catalog, state in states:
+            catalog.__dict__.update(state)
+
+    def test_04_catalog_misses_fall_back(self, client, admin_client):
+        from reviews import catalog
+        from reviews.models import Category, Genre, Title
+
+        titles, _, _ = create_titles(admin_client)
+        client.get('/api/v1/titles/?genre=comedy&category=films')
+
+        def add_slugs():
+            category = Category.objects.create(name='Игры', slug='games')
+            genre = Genre.objects.create(name='Квест', slug='quest')
+            title = Title.objects.get(pk=titles[0]['id'])
+            title.category = category
+            title.save()
+            title.genre.add(genre)
+
+        self.other_worker(add_slugs)
+        assert catalog.categories.ids_iexact('games') == []
+        for url in ('/api/v1/titles/?category=GAMES',
+                    '/api/v1/titles/?genre=Quest'):
+            response = client.get(url)
+            assert [title['id'] for title in response.json()['results']] == [
+                titles[0]['id']
+            ], (
+                'Проверьте, что slug, которого ещё нет в справочнике, '
+                'ищется в базе.'
+            )
+
+    def test_05_deleted_catalog_entry(self, admin_client):
+        from reviews import catalog
+        from reviews.models import Category, Genre
+
+        create_titles(admin_client)
+        data = {'name': 'Новое', 'year': 2000, 'category': 'films',
+                'genre': ['comedy']}
+        assert admin_client.post('/api/v1/titles/', data=data).status_code == (
+            HTTPStatus.CREATED
+        )
+        self.other_worker(lambda: (
+            Genre.objects.filter(slug='comedy').delete(),
+            Category.objects.filter(slug='films').delete(),
+        ))
+        assert catalog.categories.get('films') is not None
+        response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что удалённые в другом процессе категории и жанры '
+            'не принимаются из справочника.'
+        )
+        assert 'category' in response.json()
+        assert catalog.categories.get('films') is None
+
+    def create_reviews(self, count):
+        from reviews.models import Comment, Review, Title, User
+
+        titles = [
+            Title.objects.create(name=f'Каскад {idx}') for idx in (1, 2)
+        ]
+        authors = [
+            User.objects.create(username=f'cascade{count}_{idx}',
+                                email=f'cascade{count}_{idx}@yamdb.fake')
+            for idx in range(count)
+        ]
+        reviews = [
+            Review.objects.create(title=title, author=author, text='отзыв',
+                                  score=5 + idx)
+            for title in titles
+            for idx, author in enumerate(authors[:2])
+        ] + [
+            Review.objects.create(title=titles[0], author=author,
+                                  text='отзыв', score=4)
+            for author in authors[2:]
+        ]
+        for review in reviews:
+            Comment.objects.create(review=review, author=authors[0],
+                                   text='комментарий')
+        return titles, authors
+
+    def count_delete(self, obj):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            obj.delete()
+        return len(context)
+
+    def test_06_cascade_delete_budget(self):
+        from reviews.models import Title
+
+        counts = []
+        for size in (5, 20):
+            titles, authors = self.create_reviews(size)
+            counts.append((
+                self.count_delete(authors[0]), self.count_delete(titles[0])
+            ))
+            second = Title.objects.get(pk=titles[1].pk)
+            assert (second.score_count, second.rating) == (1, 6.0), (
+                'Проверьте, что удаление автора пересчитывает рейтинг '
+                'его произведений.'
+            )
+        # Первое удаление ещё создаёт счётчики версий.
+        assert all(
+            large <= small for small, large in zip(counts[0], counts[1])
+        ), (
+            'Число запросов при каскадном удалении произведения или '
+            f'автора не должно расти с числом отзывов: {counts}.'
+        )
+        assert counts[0][0] <= 25 and counts[0][1] <= 10, counts
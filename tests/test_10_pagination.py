@@ -0,0 +1,116 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+
+def collect_cursor_pages(client, url):
+    results = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` с курсорной пагинацией '
+            'возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Курсорная пагинация не должна возвращать ключ `count`.'
+        )
+        results.extend(data['results'])
+        url = data['next']
+    return results
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_titles_cursor(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        results = collect_cursor_pages(
+            client, '/api/v1/titles/?pagination=cursor&page_size=1'
+        )
+        assert [title['name'] for title in results] == sorted(
+            title['name'] for title in titles
+        ), (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` обходит '
+            'все произведения в порядке названия.'
+        )
+
+    def test_02_reviews_cursor(self, client, admin_client, admin, user,
+                               user_client, moderator, moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        results = collect_cursor_pages(
+            client, f'{url}?pagination=cursor&page_size=2'
+        )
+        assert [review['id'] for review in results] == sorted(
+            (review['id'] for review in reviews), reverse=True
+        ), (
+            f'Проверьте, что курсорная пагинация `{url}` обходит все отзывы '
+            'от новых к старым.'
+        )
+
+        response = client.get(url)
+        assert 'count' in response.json(), (
+            'По умолчанию должна использоваться постраничная пагинация.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CountModes:
+
+    def test_01_count_modes(self, client):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx:02}') for idx in range(11)
+        )
+        url = '/api/v1/titles/'
+
+        for mode in ('cached', 'estimate', 'exact'):
+            data = client.get(f'{url}?count={mode}').json()
+            assert data['count'] == 11, (
+                f'Проверьте, что `?count={mode}` возвращает число объектов.'
+            )
+
+        data = client.get(f'{url}?count=none').json()
+        assert 'count' not in data, (
+            'Проверьте, что `?count=none` убирает ключ `count` из ответа.'
+        )
+        assert len(data['results']) == 10 and data['next'], (
+            'Проверьте, что без подсчёта `count` работает ссылка `next`.'
+        )
+        data = client.get(data['next']).json()
+        assert len(data['results']) == 1 and data['next'] is None
+        assert data['previous'], (
+            'Проверьте, что без подсчёта `count` работает ссылка `previous`.'
+        )
+        response = client.get(f'{url}?count=none&page=3')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_last_page(self, client):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx:02}') for idx in range(11)
+        )
+        url = '/api/v1/titles/'
+
+        data = client.get(f'{url}?count=exact&page=last').json()
+        assert len(data['results']) == 1, (
+            'Проверьте, что `?page=last` при `?count=exact` возвращает '
+            'последнюю страницу.'
+        )
+        for mode in ('none', 'cached', 'estimate'):
+            response = client.get(f'{url}?count={mode}&page=last')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `?page=last` при `?count={mode}` '
+                'возвращает статус 400.'
+            )
+            assert 'page' in response.json()
@@ -0,0 +1,43 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    def test_01_search_by_name_and_description(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/?search={}'
+
+        data = client.get(url.format('терминат')).json()
+        assert [title['id'] for title in data['results']] == [
+            titles[0]['id']
+        ], (
+            'Проверьте, что параметр `search` находит произведения '
+            'по началу слова в названии.'
+        )
+        data = client.get(url.format('YIPPIE')).json()
+        assert [title['id'] for title in data['results']] == [
+            titles[1]['id']
+        ], (
+            'Проверьте, что параметр `search` ищет по описанию '
+            'без учёта регистра.'
+        )
+        assert client.get(url.format('"*')).json()['results'] == []
+
+    def test_02_search_index_follows_writes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/?search=Хищник'
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Хищник'}
+        )
+        data = client.get(url).json()
+        assert [title['id'] for title in data['results']] == [
+            titles[0]['id']
+        ], 'Проверьте, что поисковый индекс обновляется при изменении.'
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert client.get(url).json()['results'] == [], (
+            'Проверьте, что поисковый индекс обновляется при удалении.'
+        )
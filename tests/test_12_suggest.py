@@ -0,0 +1,192 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import check_query_budget, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Suggest:
+    url = '/api/v1/suggest/'
+
+    def test_01_suggest(self, client, admin_client, user_client):
+        titles, categories, genres = create_titles(admin_client)
+        create_single_review(user_client, titles[1]['id'], 'отзыв', 9)
+        client.get(f'{self.url}?q=к')
+
+        response = check_query_budget(client, f'{self.url}?q=К', 0)
+        data = response.json()
+        assert [title['id'] for title in data['titles']] == [
+            titles[1]['id']
+        ], (
+            f'Проверьте, что `{self.url}` подсказывает произведения '
+            'по началу названия.'
+        )
+        assert data['titles'][0]['rating'] == 9
+        assert [genre['slug'] for genre in data['genres']] == ['comedy']
+        assert [item['slug'] for item in data['categories']] == ['books']
+
+        data = client.get(f'{self.url}?q=орешек&type=titles').json()
+        assert list(data) == ['titles'] and len(data['titles']) == 1, (
+            f'Проверьте, что `{self.url}` ищет по началу любого слова '
+            'и учитывает параметр `type`.'
+        )
+
+    def test_02_suggest_follows_writes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        client.get(f'{self.url}?q=т')
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Чужой'}
+        )
+        assert client.get(f'{self.url}?q=т').json()['titles'] == []
+        assert client.get(f'{self.url}?q=чуж').json()['titles'][0]['id'] == (
+            titles[0]['id']
+        ), f'Проверьте, что `{self.url}` учитывает изменение названия.'
+
+    def test_03_suggest_validation(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(f'{self.url}?q=a&limit=1000')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_stale_index_served_during_rebuild(self, client,
+                                                  admin_client):
+        from reviews.suggest import suggestions
+
+        titles, _, _ = create_titles(admin_client)
+        client.get(f'{self.url}?q=К')
+        suggestions._expires = 0
+        with suggestions._build_lock:
+            response = check_query_budget(client, f'{self.url}?q=К', 0)
+        assert [title['id'] for title in response.json()['titles']] == [
+            titles[1]['id']
+        ], (
+            'Проверьте, что во время перестроения подсказки отдаются '
+            'по прежнему индексу без ожидания.'
+        )
+
+    def test_05_updates_during_rebuild_kept(self, client, admin_client):
+        from reviews.suggest import suggestions
+
+        titles, _, _ = create_titles(admin_client)
+        client.get(f'{self.url}?q=К')
+        build = suggestions._build
+
+        def build_with_update():
+            indexes = build()
+            admin_client.patch(
+                f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Кобра'}
+            )
+            return indexes
+
+        suggestions._expires = 0
+        suggestions._build = build_with_update
+        try:
+            client.get(f'{self.url}?q=Кобра')
+            suggestions._rebuild_thread.join()
+        finally:
+            del suggestions._build
+        data = client.get(f'{self.url}?q=Кобра').json()
+        assert [title['id'] for title in data['titles']] == [
+            titles[0]['id']
+        ], 'Проверьте, что изменения во время перестроения не теряются.'
+
+    def test_06_rebuild_in_background(self, client, admin_client):
+        import threading
+
+        from reviews.suggest import suggestions
+
+        titles, _, _ = create_titles(admin_client)
+        client.get(f'{self.url}?q=К')
+        build = suggestions._build
+        release = threading.Event()
+
+        def slow_build():
+            release.wait(5)
+            return build()
+
+        suggestions._expires = 0
+        suggestions._build = slow_build
+        try:
+            response = check_query_budget(client, f'{self.url}?q=К', 0)
+            assert suggestions._rebuild_thread.is_alive(), (
+                'Проверьте, что устаревшие индексы перестраиваются в фоне, '
+                'а запрос отвечает по прежним.'
+            )
+        finally:
+            release.set()
+            suggestions._rebuild_thread.join()
+            del suggestions._build
+        assert [title['id'] for title in response.json()['titles']] == [
+            titles[1]['id']
+        ]
+
+
+def test_prefix_index_concurrent_search():
+    import threading
+
+    from reviews.suggest import PrefixIndex
+
+    index = PrefixIndex.build(
+        (pk, f'Название {pk}', pk, pk) for pk in range(2000)
+    )
+    errors = []
+
+    def churn():
+        for pk in range(2000):
+            index.remove(pk)
+            index.add(pk, f'Название {pk}', pk, pk)
+
+    def search():
+        try:
+            for _ in range(300):
+                index.search('назв', 10)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=churn)] + [
+        threading.Thread(target=search) for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert index.search('назв', 3) == [0, 1, 2]
+
+
+def test_prefix_index_tops_updated_in_place():
+    import random
+
+    from reviews.suggest import PrefixIndex
+
+    index = PrefixIndex.build(
+        (pk, f'Название {pk}', (pk, ''), pk) for pk in range(2000)
+    )
+    assert index.search('назв', 10) == list(range(10))
+    rng = random.Random(1)
+    ranks = {pk: (pk, '') for pk in range(2000)}
+    scans = []
+    scan = index._scan
+
+    def counted_scan(prefix, limit):
+        scans.append(prefix)
+        return scan(prefix, limit)
+
+    index._scan = counted_scan
+    for step in range(500):
+        pk = rng.randrange(2000)
+        if step % 10 == 0:
+            index.remove(pk)
+            ranks.pop(pk, None)
+        else:
+            ranks[pk] = (rng.randrange(3000), '')
+            index.add(pk, f'Название {pk}', ranks[pk], pk)
+        expected = [pk for _, pk in sorted(
+            (rank, pk) for pk, rank in ranks.items()
+        )[:10]]
+        assert index.search('назв', 10) == expected
+    assert len(scans) < 50, (
+        'Проверьте, что изменения записей правят сохранённые лучшие '
+        'результаты, а не сбрасывают их.'
+    )
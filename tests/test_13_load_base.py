@@ -0,0 +1,97 @@
+import json
+import os
+import shutil
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name in os.listdir(DATA_DIR):
+        shutil.copy(os.path.join(DATA_DIR, name), tmp_path)
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13LoadBase:
+
+    def test_01_load_in_batches(self, data_dir):
+        from reviews.models import Comment, Review, Title
+
+        call_command('load_base', data_dir=str(data_dir), batch_size=5,
+                     verbosity=0)
+        assert Review.objects.count() == 72
+        assert Comment.objects.exists()
+        assert not Title.objects.filter(
+            reviews__isnull=False, rating__isnull=True
+        ).exists(), 'Проверьте, что после загрузки пересчитан рейтинг.'
+        assert not Review.objects.filter(pub_date__year__gt=2022).exists(), (
+            'Проверьте, что даты отзывов берутся из csv.'
+        )
+        assert not os.path.exists(
+            data_dir / '.load_base_checkpoint.json'
+        ), 'Контрольная точка должна удаляться после успешной загрузки.'
+
+    def test_02_resume(self, data_dir):
+        from reviews.models import Category, Genre
+
+        Category.objects.create(id=1, name='Фильм', slug='movie')
+        with open(data_dir / '.load_base_checkpoint.json', 'w') as file:
+            json.dump({'category.csv': 1}, file)
+
+        call_command('load_base', data_dir=str(data_dir), resume=True,
+                     verbosity=0)
+        assert Category.objects.count() == 3, (
+            'Проверьте, что `--resume` продолжает загрузку с контрольной '
+            'точки и не повторяет загруженные строки.'
+        )
+        assert Genre.objects.count() == 15
+
+    def test_03_parallel_jobs(self, data_dir):
+        from reviews.management.commands.load_base import (TABLES,
+                                                           table_dependencies)
+        from reviews.models import Category, Comment, Review, Title, User
+
+        dependencies = table_dependencies(TABLES)
+        assert dependencies[Title] == {Category}
+        assert dependencies[Comment] == {Review, User}
+
+        call_command('load_base', data_dir=str(data_dir), jobs=3,
+                     verbosity=0)
+        assert Review.objects.count() == 72, (
+            'Проверьте, что `--jobs` загружает все таблицы.'
+        )
+
+    def test_04_upsert(self, data_dir):
+        from reviews.models import Category, Review
+
+        call_command('load_base', data_dir=str(data_dir), verbosity=0)
+        path = data_dir / 'category.csv'
+        path.write_text(
+            path.read_text(encoding='utf-8').rstrip() + '\n4,Сериал,series\n',
+            encoding='utf-8'
+        )
+        path = data_dir / 'genre.csv'
+        path.write_text(
+            path.read_text(encoding='utf-8').replace('Драма', 'Драмы'),
+            encoding='utf-8'
+        )
+
+        out = StringIO()
+        call_command('load_base', data_dir=str(data_dir), mode='upsert',
+                     stdout=out)
+        report = out.getvalue()
+        assert 'category.csv: добавлено 1, обновлено 0, без изменений 3' in (
+            report
+        ), 'Проверьте, что `--mode=upsert` добавляет только новые строки.'
+        assert 'genre.csv: добавлено 0, обновлено 1, без изменений 14' in (
+            report
+        ), 'Проверьте, что `--mode=upsert` обновляет изменённые строки.'
+        assert Category.objects.filter(slug='series').exists()
+        assert Review.objects.count() == 72
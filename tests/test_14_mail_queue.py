@@ -0,0 +1,75 @@
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14MailQueue:
+    url_signup = '/api/v1/auth/signup/'
+
+    def test_01_signup_enqueues_mail(self, client):
+        from reviews.models import PENDING, SENT, OutboxMessage
+
+        data = {'email': 'queue@yamdb.fake', 'username': 'queue_user'}
+        client.post(self.url_signup, data=data)
+        client.post(self.url_signup, data=data)
+        assert len(mail.outbox) == 0, (
+            'Письмо с кодом подтверждения должно отправляться из очереди, '
+            'а не во время запроса.'
+        )
+        assert OutboxMessage.objects.filter(status=PENDING).count() == 1, (
+            'Повторная регистрация не должна дублировать неотправленное '
+            'письмо.'
+        )
+
+        call_command('send_queued_mail')
+        assert [message.to for message in mail.outbox] == [[data['email']]]
+        assert OutboxMessage.objects.get().status == SENT
+
+    def test_02_retry_with_backoff(self):
+        from reviews.models import FAILED, PENDING, OutboxMessage
+        from reviews.outbox import deliver_pending
+
+        OutboxMessage.enqueue('retry@yamdb.fake', 'Код', '123')
+        with mock.patch(
+            'django.core.mail.EmailMessage.send',
+            side_effect=ConnectionError('smtp down')
+        ):
+            assert deliver_pending() == (0, 1)
+            assert deliver_pending() == (0, 0), (
+                'Письмо после ошибки должно откладываться.'
+            )
+            message = OutboxMessage.objects.get()
+            assert message.status == PENDING and message.attempts == 1
+            assert 'smtp down' in message.last_error
+
+            for _ in range(4):
+                OutboxMessage.objects.update(send_after=message.created)
+                deliver_pending()
+        message.refresh_from_db()
+        assert (message.status, message.attempts) == (FAILED, 5)
+
+    def test_03_send_outside_transaction(self):
+        from django.db import connection
+        from reviews.models import SENT, OutboxMessage
+        from reviews.outbox import deliver_pending
+
+        OutboxMessage.enqueue('lease@yamdb.fake', 'Код', '123')
+
+        def send(*args, **kwargs):
+            assert not connection.in_atomic_block, (
+                'Письма должны отправляться вне транзакции.'
+            )
+            assert deliver_pending() == (0, 0), (
+                'Письма, которые отправляет другой воркер, не должны '
+                'забираться повторно.'
+            )
+            return 1
+
+        with mock.patch('django.core.mail.EmailMessage.send',
+                        side_effect=send):
+            assert deliver_pending() == (1, 0)
+        message = OutboxMessage.objects.get()
+        assert (message.status, message.attempts) == (SENT, 1)
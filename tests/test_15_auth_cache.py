@@ -0,0 +1,168 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import check_query_budget
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15AuthUserCache:
+    url = '/api/v1/users/me/'
+
+    def test_01_me_served_from_cache(self, user_client, user):
+        user_client.get(self.url)
+        data = check_query_budget(user_client, self.url, 0).json()
+        assert data['username'] == user.username and data['bio'] == user.bio
+
+        response = user_client.patch(self.url, data={'bio': 'новое'})
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(self.url).json()['bio'] == 'новое', (
+            'Проверьте, что кэш пользователя сбрасывается при изменении.'
+        )
+
+    def test_02_role_change_invalidates(self, admin_client, user_client,
+                                        user):
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        response = user_client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена роли сразу учитывается при проверке прав.'
+        )
+
+        user.is_active = False
+        user.save()
+        assert user_client.get(self.url).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TokenClaims:
+
+    def get_client(self, user):
+        from api.authentication import access_token_for
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {access_token_for(user)}'
+        )
+        return client
+
+    def test_01_safe_methods_use_claims(self, admin):
+        client = self.get_client(admin)
+        client.get('/api/v1/users/')
+        client.get('/api/v1/users/me/')
+        check_query_budget(client, '/api/v1/users/', 2)
+        data = check_query_budget(client, '/api/v1/users/me/', 0).json()
+        assert data['username'] == admin.username
+
+    def test_02_role_change_revokes_token(self, admin_client, moderator):
+        client = self.get_client(moderator)
+        assert client.get('/api/v1/titles/').status_code == HTTPStatus.OK
+        admin_client.patch(
+            f'/api/v1/users/{moderator.username}/', data={'role': 'user'}
+        )
+        assert client.get('/api/v1/titles/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что смена роли отзывает выданные токены.'
+        moderator.refresh_from_db()
+        client = self.get_client(moderator)
+        assert client.get('/api/v1/titles/').status_code == HTTPStatus.OK
+
+    def test_03_revoke_seen_by_other_workers(self, admin_client, moderator,
+                                             settings):
+        import time
+        from unittest import mock
+
+        settings.CACHES = {
+            **settings.CACHES,
+            'worker1': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'worker1',
+            },
+            'worker2': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'worker2',
+            },
+        }
+        client = self.get_client(moderator)
+        settings.AUTH_USER_CACHE = 'worker2'
+        assert client.get('/api/v1/titles/').status_code == HTTPStatus.OK
+
+        settings.AUTH_USER_CACHE = 'worker1'
+        admin_client.patch(
+            f'/api/v1/users/{moderator.username}/', data={'role': 'user'}
+        )
+
+        settings.AUTH_USER_CACHE = 'worker2'
+        later = time.time() + settings.AUTH_LOCAL_CACHE_TIMEOUT + 1
+        with mock.patch(
+            'django.core.cache.backends.locmem.time.time',
+            return_value=later,
+        ):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что отзыв токенов доходит до других воркеров '
+            'с локальным кэшем не позже AUTH_LOCAL_CACHE_TIMEOUT.'
+        )
+
+    def test_04_admin_site_revokes_token(self, client, user_superuser,
+                                         moderator):
+        token_client = self.get_client(moderator)
+        assert token_client.get('/api/v1/titles/').status_code == (
+            HTTPStatus.OK
+        )
+        client.force_login(user_superuser)
+        url = f'/admin/reviews/user/{moderator.pk}/change/'
+        form = client.get(url).context['adminform'].form
+        data = {
+            name: value for name, value in form.initial.items()
+            if value is not None and name not in ('groups',
+                                                  'user_permissions')
+        }
+        data['role'] = 'user'
+        data['last_login_0'] = data['last_login_1'] = ''
+        data['date_joined_0'], data['date_joined_1'] = (
+            form.initial['date_joined'].strftime('%Y-%m-%d %H:%M:%S')
+            .split()
+        )
+        response = client.post(url, data)
+        assert response.status_code == HTTPStatus.FOUND, (
+            response.context and response.context['adminform'].form.errors
+        )
+        assert token_client.get('/api/v1/titles/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что смена роли в админке отзывает выданные токены.'
+
+    def test_05_load_base_revokes_token(self, tmp_path):
+        import shutil
+
+        from django.core.management import call_command
+        from reviews.models import User
+
+        from tests.test_13_load_base import DATA_DIR
+
+        shutil.copytree(DATA_DIR, tmp_path, dirs_exist_ok=True)
+        call_command('load_base', data_dir=str(tmp_path), verbosity=0)
+        user = User.objects.get(username='bingobongo')
+        client = self.get_client(user)
+        assert client.get('/api/v1/titles/').status_code == HTTPStatus.OK
+        path = tmp_path / 'users.csv'
+        path.write_text(
+            path.read_text(encoding='utf-8').replace(
+                'bingobongo@yamdb.fake,user', 'bingobongo@yamdb.fake,admin'
+            ),
+            encoding='utf-8'
+        )
+        call_command('load_base', data_dir=str(tmp_path), mode='upsert',
+                     verbosity=0)
+        user.refresh_from_db()
+        assert user.role == 'admin'
+        assert client.get('/api/v1/titles/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что смена роли через load_base отзывает токены.'
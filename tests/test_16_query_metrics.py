@@ -0,0 +1,68 @@
+import logging
+import re
+import time
+from unittest import mock
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16QueryMetrics:
+
+    def test_01_server_timing(self, settings, client, admin_client):
+        create_titles(admin_client)
+        settings.QUERY_METRICS_ENABLED = True
+        response = client.get('/api/v1/titles/')
+        timing = response.get('Server-Timing', '')
+        for metric in ('db;dur=', 'desc="4 queries"', 'view;dur=',
+                       'serialize;dur=', 'render;dur=', 'total;dur='):
+            assert metric in timing, (
+                'Проверьте, что при включённом `QUERY_METRICS_ENABLED` '
+                f'ответ содержит `{metric}` в заголовке `Server-Timing`.'
+            )
+
+    def test_02_slow_request_logged(self, settings, client, caplog):
+        settings.QUERY_METRICS_ENABLED = True
+        settings.QUERY_METRICS_MAX_QUERIES = 0
+        with caplog.at_level(logging.WARNING, logger='api.performance'):
+            client.get('/api/v1/titles/')
+        assert 'FROM "reviews_title"' in caplog.text, (
+            'Проверьте, что запросы сверх лимита SQL-запросов пишутся в лог '
+            'вместе с текстом SQL.'
+        )
+
+    def test_03_disabled_by_default(self, client):
+        assert 'Server-Timing' not in client.get('/api/v1/titles/')
+
+    def test_04_serialize_timed(self, settings, client, admin_client):
+        from api.serializers import CategorySerializer, TitleReadSerializer
+
+        titles, _, _ = create_titles(admin_client)
+        settings.QUERY_METRICS_ENABLED = True
+        settings.RESPONSE_CACHE = ''
+        settings.FAST_READ_SERIALIZERS = False
+
+        def slow(serializer_class):
+            to_representation = serializer_class.to_representation
+
+            def wrapper(self, instance):
+                time.sleep(0.02)
+                return to_representation(self, instance)
+
+            return mock.patch.object(
+                serializer_class, 'to_representation', wrapper
+            )
+
+        for url, serializer_class in (
+            ('/api/v1/categories/', CategorySerializer),
+            (f'/api/v1/titles/{titles[0]["id"]}/', TitleReadSerializer),
+        ):
+            with slow(serializer_class):
+                timing = client.get(url)['Server-Timing']
+            serialize = float(re.search(r'serialize;dur=([\d.]+)', timing)[1])
+            assert serialize >= 20, (
+                'Проверьте, что время `serializer.data` попадает в '
+                f'`serialize;dur=` заголовка `Server-Timing`: {timing}'
+            )
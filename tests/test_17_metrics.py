@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from api.metrics import BUCKETS, Registry
+
+METRICS_URL = '/metrics'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Metrics:
+
+    def test_01_requests_labelled_by_action(self, admin_client):
+        admin_client.get('/api/v1/titles/')
+        admin_client.post('/api/v1/categories/', data={})
+        response = admin_client.get(METRICS_URL)
+        assert response.status_code == 200, (
+            f'Проверьте, что администратору доступен `{METRICS_URL}`.'
+        )
+        assert response['Content-Type'].startswith('text/plain'), (
+            'Проверьте, что метрики отдаются в текстовом формате Prometheus.'
+        )
+        text = response.content.decode()
+        assert (
+            'api_request_duration_seconds_bucket{view="TitleViewSet.list",'
+            'le="+Inf"}' in text
+        ), 'Проверьте, что гистограмма помечена вьюсетом и действием.'
+        assert (
+            'api_requests_total{view="CategoryViewSet.create",'
+            'method="POST",status="400"}' in text
+        ), 'Проверьте, что запросы считаются по статусам.'
+        assert 'api_requests_in_flight{view="MetricsAPIView.get"} 1' in text
+
+    def test_02_admin_only(self, client, user_client):
+        assert client.get(METRICS_URL).status_code == 401
+        assert user_client.get(METRICS_URL).status_code == 403, (
+            'Проверьте, что метрики доступны только администратору.'
+        )
+
+    def test_03_histogram(self):
+        registry = Registry()
+        registry.started('A.list')
+        registry.finished('A.list', 'GET', 200, 0.02)
+        registry.started('A.list')
+        registry.finished('A.list', 'GET', 200, 100)
+        text = registry.render()
+        assert 'api_request_duration_seconds_bucket{view="A.list",le="0.01"} 0' in text
+        assert 'api_request_duration_seconds_bucket{view="A.list",le="0.025"} 1' in text
+        assert f'api_request_duration_seconds_bucket{{view="A.list",le="{BUCKETS[-1]}"}} 1' in text
+        assert 'api_request_duration_seconds_bucket{view="A.list",le="+Inf"} 2' in text
+        assert 'api_request_duration_seconds_count{view="A.list"} 2' in text
+        assert 'api_requests_in_flight{view="A.list"} 0' in text
+
+    def test_04_multiprocess_aggregation(self, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        registry = Registry()
+        registry.started('A.list')
+        registry.finished('A.list', 'GET', 200, 0.02)
+        dead_worker = {
+            'durations': {'A.list': [[0] * len(BUCKETS), 1.5, 3]},
+            'requests': {'A.list\x1fGET\x1f200': 3},
+            'in_flight': {'A.list': 2},
+        }
+        (tmp_path / '999999999.json').write_text(json.dumps(dead_worker))
+        text = registry.render()
+        assert 'api_requests_total{view="A.list",method="GET",status="200"} 4' in text, (
+            'Проверьте, что `/metrics` суммирует снимки всех процессов.'
+        )
+        assert 'api_request_duration_seconds_count{view="A.list"} 4' in text
+        assert 'api_requests_in_flight{view="A.list"} 0' in text, (
+            'Проверьте, что запросы в обработке завершившихся процессов '
+            'не учитываются.'
+        )
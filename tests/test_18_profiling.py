@@ -0,0 +1,69 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.profiling import make_profile_token, stored_profiles
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 0
+    settings.PROFILING_DIR = str(tmp_path)
+    return settings
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Profiling:
+
+    def test_01_sampled_request(self, profiling, client):
+        profiling.PROFILING_SAMPLE_RATE = 1
+        client.get('/api/v1/titles/')
+        profiles = stored_profiles(profiling.PROFILING_DIR)
+        assert len(profiles) == 1, (
+            'Проверьте, что при `PROFILING_SAMPLE_RATE = 1` профиль '
+            'сохраняется для каждого запроса.'
+        )
+        assert os.path.exists(f'{profiles[0]}.json'), (
+            'Проверьте, что рядом с профилем сохраняются сведения о запросе.'
+        )
+
+    def test_02_signed_header(self, profiling, client):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/', HTTP_X_PROFILE='profile:bad:sign')
+        assert not stored_profiles(profiling.PROFILING_DIR), (
+            'Проверьте, что без подписанного заголовка запрос '
+            'не профилируется.'
+        )
+        client.get('/api/v1/titles/', HTTP_X_PROFILE=make_profile_token())
+        assert len(stored_profiles(profiling.PROFILING_DIR)) == 1, (
+            'Проверьте, что заголовок `X-Profile` с подписью включает '
+            'профилирование запроса.'
+        )
+
+    def test_03_rotation(self, profiling, client):
+        profiling.PROFILING_SAMPLE_RATE = 1
+        profiling.PROFILING_MAX_FILES = 2
+        for _ in range(4):
+            client.get('/api/v1/genres/')
+        assert len(stored_profiles(profiling.PROFILING_DIR)) == 2, (
+            'Проверьте, что хранятся только последние '
+            '`PROFILING_MAX_FILES` профилей.'
+        )
+        assert len(os.listdir(profiling.PROFILING_DIR)) == 4
+
+    def test_04_report(self, profiling, client):
+        profiling.PROFILING_SAMPLE_RATE = 1
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/genres/')
+        out = StringIO()
+        call_command(
+            'profile_report', '--dir', profiling.PROFILING_DIR,
+            '--view', 'TitleViewSet.list', '--top', '5', stdout=out,
+        )
+        report = out.getvalue()
+        assert 'Профилей: 1' in report
+        assert 'TitleViewSet.list: 1 запросов' in report
+        assert 'cumulative' in report or 'cumtime' in report
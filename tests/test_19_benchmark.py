@@ -0,0 +1,72 @@
+import pytest
+from django.db.models import Count
+
+from api.benchmark import SCENARIOS, compare, percentile, run
+from reviews.models import Comment, GenreTitle, Review, Title, User
+from reviews.synthetic import Dataset, split_total
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Benchmark:
+
+    def test_01_dataset(self):
+        counts = Dataset(
+            titles=30, users=20, reviews=200, comments=300, seed=1
+        ).save()
+        assert counts[Title] == 30 and counts[User] == 20
+        assert Review.objects.count() == 200
+        assert Comment.objects.count() <= 300
+        assert GenreTitle.objects.count() >= 30
+        per_title = sorted(
+            Review.objects.order_by().values('title')
+            .annotate(total=Count('id'))
+            .values_list('total', flat=True),
+            reverse=True,
+        )
+        assert per_title[0] == 20, (
+            'Проверьте, что отзывы распределены по закону Ципфа и у '
+            'популярного произведения отзыв оставил каждый пользователь.'
+        )
+        assert per_title[-1] < per_title[0] / 4
+        assert Title.objects.filter(score_count__gt=0).count() == len(
+            per_title
+        ), 'Проверьте, что после генерации пересчитывается рейтинг.'
+
+    def test_02_dataset_is_deterministic(self):
+        first = dict(Dataset(10, 5, 30, 10, seed=3).rows())
+        second = dict(Dataset(10, 5, 30, 10, seed=3).rows())
+        assert first[Review] == second[Review]
+        assert first[Comment] == second[Comment]
+
+    def test_03_run_scenarios(self):
+        Dataset(titles=20, users=10, reviews=60, comments=60).save()
+        results = run(SCENARIOS, ('client', 'wsgi'), requests=3, warmup=1)
+        assert len(results) == 2 * len(SCENARIOS)
+        for key, result in results.items():
+            assert result['errors'] == 0, f'Ошибки в сценарии {key}'
+            assert result['queries_per_request'] > 0
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+
+
+def test_split_total():
+    assert split_total(10, [3, 1], 6) == [6, 4]
+    assert split_total(10, [1, 1], 3) == [3, 3]
+
+
+def test_percentile():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([5], 95) == 5
+
+
+def test_compare():
+    baseline = {'client:titles_list': {'p95_ms': 10, 'queries_per_request': 3}}
+    assert not compare(
+        {'client:titles_list': {'p95_ms': 11, 'queries_per_request': 3}},
+        baseline, 0.2,
+    )
+    assert compare(
+        {'client:titles_list': {'p95_ms': 10, 'queries_per_request': 4}},
+        baseline, 0.2,
+    ) == ['client:titles_list: queries_per_request 3 -> 4']
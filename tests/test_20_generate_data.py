@@ -0,0 +1,124 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+SIZES = {
+    'titles': 40, 'users': 15, 'reviews': 150, 'comments': 200,
+    'categories': 3, 'genres': 5, 'seed': 7,
+}
+
+
+def check_pub_dates(model):
+    from django.db.models import Max, Min
+
+    dates = model.objects.aggregate(first=Min('pub_date'),
+                                    last=Max('pub_date'))
+    assert dates['first'].year < 2015 and dates['last'].year < 2024, (
+        f'Проверьте, что даты {model.__name__} записываются из набора, '
+        'а не заменяются текущим временем.'
+    )
+    assert model.objects.values('pub_date').distinct().count() > 1
+
+
+def read_dir(path):
+    return {
+        csv_file.name: csv_file.read_text(encoding='utf-8')
+        for csv_file in sorted(path.iterdir())
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20GenerateData:
+
+    def test_01_database(self):
+        from reviews.models import (ADMIN, USER, Comment, GenreTitle, Review,
+                                    Title, User)
+
+        call_command('generate_data', stdout=StringIO(), **SIZES)
+        assert Title.objects.count() == 40
+        assert Review.objects.count() == 150
+        assert 0 < Comment.objects.count() <= 200
+        assert GenreTitle.objects.count() > 40, (
+            'Проверьте, что произведения могут относиться к нескольким жанрам.'
+        )
+        assert User.objects.filter(role=USER).exists()
+        assert not Title.objects.filter(
+            reviews__isnull=False, rating__isnull=True
+        ).exists(), 'Проверьте, что после генерации пересчитан рейтинг.'
+        check_pub_dates(Review)
+        check_pub_dates(Comment)
+
+        call_command('generate_data', stdout=StringIO(), **SIZES)
+        assert Title.objects.count() == 80, (
+            'Проверьте, что повторная генерация добавляет данные к '
+            'существующим.'
+        )
+        assert User.objects.filter(role=ADMIN).count() < User.objects.count()
+
+    def test_02_csv_for_load_base(self, tmp_path):
+        from reviews.models import Comment, Review
+
+        call_command(
+            'generate_data', csv_dir=str(tmp_path), stdout=StringIO(),
+            **SIZES
+        )
+        assert {path.name for path in tmp_path.iterdir()} == {
+            'category.csv', 'genre.csv', 'titles.csv', 'genre_title.csv',
+            'users.csv', 'review.csv', 'comments.csv',
+        }
+        call_command('load_base', data_dir=str(tmp_path), verbosity=0)
+        assert Review.objects.count() == 150
+        assert Comment.objects.exists()
+        check_pub_dates(Review)
+        check_pub_dates(Comment)
+
+    def test_03_deterministic_across_jobs(self, tmp_path):
+        single, parallel = tmp_path / 'single', tmp_path / 'parallel'
+        options = dict(SIZES, titles=300, reviews=600)
+        call_command(
+            'generate_data', csv_dir=str(single), jobs=1,
+            stdout=StringIO(), **options
+        )
+        call_command(
+            'generate_data', csv_dir=str(parallel), jobs=2,
+            stdout=StringIO(), **options
+        )
+        assert read_dir(single) == read_dir(parallel), (
+            'Проверьте, что результат зависит только от --seed, '
+            'а не от --jobs.'
+        )
+
+    def test_04_shards_in_processes(self):
+        from reviews.synthetic import MODELS, Dataset
+
+        first_ids = {model: 1 for model in MODELS}
+        dataset = Dataset(200, 20, 800, 900, seed=1, shard_size=50)
+        single = list(dataset.rows(first_ids, jobs=1))
+        assert list(dataset.rows(first_ids, jobs=3)) == single
+        review_ids = [
+            row['id'] for model, rows in single for row in rows
+            if model.__name__ == 'Review'
+        ]
+        assert len(review_ids) == len(set(review_ids)) == 800
+
+
+def test_bounded_map_keeps_window():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from reviews.synthetic import bounded_map
+
+    submitted = []
+
+    class Pool(ThreadPoolExecutor):
+        def submit(self, func, item):
+            submitted.append(item)
+            return super().submit(func, item)
+
+    with Pool(2) as pool:
+        results = bounded_map(pool, lambda item: item * 2, range(10), 3)
+        assert next(results) == 0
+        assert len(submitted) == 3, (
+            'Проверьте, что в работу отправляется не больше `window` частей.'
+        )
+        assert list(results) == [item * 2 for item in range(1, 10)]
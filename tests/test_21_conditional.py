@@ -0,0 +1,144 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews, create_single_review, create_titles
+
+
+def revalidate(client, url, **headers):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, **headers)
+    return response, len(context)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Conditional:
+
+    def test_01_not_modified_without_list_query(self, client, admin_client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        response, queries = revalidate(client, url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при совпадении `If-None-Match` возвращается 304.'
+        )
+        assert queries == 1, (
+            'Проверьте, что ответ 304 не выполняет запрос списка.'
+        )
+        assert response['ETag'] == etag
+        response, _ = revalidate(
+            client, url,
+            HTTP_IF_MODIFIED_SINCE=client.get(url)['Last-Modified'],
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert client.get(
+            f'{url}?year=1', HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag зависит от параметров запроса.'
+        )
+
+    def test_02_changes_invalidate(self, client, admin_client, user_client,
+                                   admin):
+        titles, categories, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        title_url = f'/api/v1/titles/{title_id}/'
+        reviews_url = f'{title_url}reviews/'
+        etags = {
+            url: client.get(url)['ETag']
+            for url in ('/api/v1/titles/', title_url, reviews_url,
+                        '/api/v1/categories/', '/api/v1/genres/')
+        }
+
+        create_single_review(user_client, title_id, 'отзыв', 8)
+        for url in ('/api/v1/titles/', title_url, reviews_url):
+            assert client.get(
+                url, HTTP_IF_NONE_MATCH=etags[url]
+            ).status_code == HTTPStatus.OK, (
+                f'Проверьте, что новый отзыв меняет ETag `{url}`: '
+                'в ответе изменился рейтинг или список отзывов.'
+            )
+        assert client.get(
+            '/api/v1/genres/', HTTP_IF_NONE_MATCH=etags['/api/v1/genres/']
+        ).status_code == HTTPStatus.NOT_MODIFIED
+
+        etag = client.get(title_url)['ETag']
+        admin_client.delete(f'/api/v1/categories/{categories[0]["slug"]}/')
+        assert client.get(
+            title_url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение категории меняет ETag произведения.'
+        )
+
+    def test_03_comments_and_errors(self, client, admin_client, admin,
+                                    user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        etag = client.get(url)['ETag']
+        user_client.post(url, data={'text': 'комментарий'})
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK
+        response = client.get('/api/v1/titles/999/reviews/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert 'ETag' not in response
+
+    def test_04_authors_only_on_username_change(self, client, admin_client,
+                                                user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'отзыв', 5)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@example.com',
+        })
+        user.revoke_tokens()
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'bio': 'о себе'}
+        )
+        assert client.get(url)['ETag'] == etag, (
+            'Проверьте, что регистрация, отзыв токенов и изменения профиля '
+            'без смены имени не сбрасывают валидаторы отзывов.'
+        )
+
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'}
+        )
+        response = client.get(url)
+        assert response['ETag'] != etag
+        assert response.json()['results'][0]['author'] == 'renamed'
+
+    def test_05_titles_bumped_after_commit(self, admin_client, user):
+        from django.db import transaction
+        from reviews.models import ResourceVersion, Review
+        from reviews.versions import TITLES, title_key
+
+        titles, _, _ = create_titles(admin_client)
+        keys = (TITLES, title_key(titles[0]['id']))
+        before = ResourceVersion.get_many(keys)
+        with transaction.atomic():
+            Review.objects.create(title_id=titles[0]['id'], author=user,
+                                  text='отзыв', score=7)
+            inside = ResourceVersion.get_many(keys)
+        after = ResourceVersion.get_many(keys)
+        assert inside[TITLES] == before[TITLES], (
+            'Проверьте, что отзыв не блокирует общий счётчик списка '
+            'произведений до конца своей транзакции.'
+        )
+        assert inside[keys[1]] != before[keys[1]]
+        assert after[TITLES] != before[TITLES], (
+            'Проверьте, что версия списка произведений увеличивается '
+            'после фиксации отзыва.'
+        )
@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ResponseCache:
+
+    def test_01_anonymous_hit(self, client, admin_client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/?year=1994&count=exact'
+        first = client.get(url)
+        assert first['X-Cache'] == 'MISS'
+        with CaptureQueriesContext(connection) as context:
+            second = client.get('/api/v1/titles/?count=exact&year=1994')
+        assert second['X-Cache'] == 'HIT', (
+            'Проверьте, что ответ берётся из кэша независимо от порядка '
+            'параметров запроса.'
+        )
+        assert len(context) == 1, (
+            'Проверьте, что ответ из кэша требует только запроса версий.'
+        )
+        assert second.content == first.content
+        assert second['ETag'] == first['ETag']
+        assert second['Content-Type'] == first['Content-Type']
+
+    def test_02_authenticated_not_cached(self, admin_client):
+        create_titles(admin_client)
+        admin_client.get('/api/v1/titles/')
+        assert 'X-Cache' not in admin_client.get('/api/v1/titles/')
+
+    def test_03_writes_invalidate(self, client, admin_client, user_client):
+        titles, _, genres = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        for url in (title_url, '/api/v1/titles/', f'{title_url}reviews/'):
+            client.get(url)
+            assert client.get(url)['X-Cache'] == 'HIT'
+
+        create_single_review(user_client, titles[0]['id'], 'отзыв', 7)
+        response = client.get(title_url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что кэш не отдаёт устаревший рейтинг.'
+        )
+        listed = {
+            title['id']: title['rating']
+            for title in client.get('/api/v1/titles/').json()['results']
+        }
+        assert listed[titles[0]['id']] == 7
+        assert client.get(f'{title_url}reviews/').json()['count'] == 1
+
+        client.get('/api/v1/genres/')
+        admin_client.delete(f'/api/v1/genres/{genres[0]["slug"]}/')
+        response = client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS'
+        assert genres[0]['slug'] not in {
+            genre['slug'] for genre in response.json()['results']
+        }
+
+    def test_04_disabled(self, settings, client, admin_client):
+        settings.RESPONSE_CACHE = None
+        create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        assert 'X-Cache' not in client.get('/api/v1/titles/')
+
+    def test_05_hit_metrics(self, client, admin_client):
+        create_titles(admin_client)
+        for _ in range(3):
+            client.get('/api/v1/categories/')
+        metrics = admin_client.get('/metrics').content.decode()
+        assert (
+            'api_response_cache_total{view="CategoryViewSet.list",'
+            'result="hit"}'
+        ) in metrics
@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23FastSerializers:
+
+    def get_both(self, client, settings, url):
+        settings.RESPONSE_CACHE = ''
+        settings.FAST_READ_SERIALIZERS = False
+        regular = client.get(url)
+        settings.FAST_READ_SERIALIZERS = True
+        fast = client.get(url)
+        return regular, fast
+
+    def test_01_same_bytes(self, client, admin_client, admin, user_client,
+                           user, moderator_client, moderator, settings):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        # Произведение без категории.
+        admin_client.delete('/api/v1/categories/books/')
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?pagination=cursor&page_size=1',
+            '/api/v1/titles/?search=терминат',
+            '/api/v1/titles/?count=none&year=1994',
+            title_url,
+            f'{title_url}reviews/',
+            f'{title_url}reviews/?pagination=cursor',
+            review_url,
+            f'{review_url}comments/',
+            f'{review_url}comments/{comments[0]["id"]}/',
+        )
+        for url in urls:
+            regular, fast = self.get_both(client, settings, url)
+            assert regular.status_code == fast.status_code == 200, url
+            assert fast.content == regular.content, (
+                'Проверьте, что быстрый сериализатор возвращает тот же '
+                f'ответ, что и обычный: {url}'
+            )
+
+    def test_02_not_found(self, client, admin_client, settings):
+        titles, _, _ = create_titles(admin_client)
+        regular, fast = self.get_both(
+            client, settings, f'/api/v1/titles/{titles[-1]["id"] + 100}/'
+        )
+        assert regular.status_code == fast.status_code == 404
+
+    def test_03_genres_in_one_query(self, client, admin_client, settings):
+        titles, _, _ = create_titles(admin_client)
+        settings.RESPONSE_CACHE = ''
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/titles/?count=none')
+        genre_queries = [
+            query for query in context.captured_queries
+            if 'reviews_genre' in query['sql']
+        ]
+        assert len(genre_queries) == 1, (
+            'Проверьте, что жанры всех произведений страницы читаются '
+            'одним запросом.'
+        )
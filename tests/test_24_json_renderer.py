@@ -0,0 +1,91 @@
+import io
+import timeit
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from api.serializers import TitleReadSerializer
+from reviews.models import Title
+from reviews.synthetic import Dataset
+
+
+class Test24JSONRenderer:
+
+    def test_01_same_bytes(self):
+        data = {
+            'pub_date': datetime(2020, 1, 2, 3, 4, 5, 678901, timezone.utc),
+            'naive': datetime(2020, 1, 2, 3, 4, 5),
+            'price': Decimal('1.50'),
+            'lazy': gettext_lazy('Not found.'),
+            'text': 'Строка с разделителем ',
+            1: [None, True, 1.5, 2 ** 70],
+        }
+        for value in (data, [data], {'nested': data}, 2 ** 70):
+            assert FastJSONRenderer().render(value) == (
+                JSONRenderer().render(value)
+            )
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_02_indent(self):
+        data = {'id': 1}
+        media_type = 'application/json; indent=4'
+        assert FastJSONRenderer().render(data, media_type) == (
+            JSONRenderer().render(data, media_type)
+        )
+
+    def test_03_parser(self):
+        body = '{"name": "Терминатор", "year": 1984, "genre": []}'.encode()
+        assert FastJSONParser().parse(io.BytesIO(body)) == (
+            JSONParser().parse(io.BytesIO(body))
+        )
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"name": NaN}'))
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"name"'))
+
+    @pytest.mark.django_db
+    def test_04_api(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/', data='{"name": "Фильм", "slug": "films"',
+            content_type='application/json',
+        )
+        assert response.status_code == 400
+        assert 'JSON parse error' in response.json()['detail']
+        response = admin_client.get(
+            '/api/v1/categories/', HTTP_ACCEPT='application/json; indent=2'
+        )
+        assert b'\n  "count"' in response.content
+
+    @pytest.fixture
+    def page(self):
+        Dataset(titles=100, users=20, reviews=200, comments=0).save()
+        return TitleReadSerializer(
+            Title.objects.select_related('category').prefetch_related(
+                'genre'
+            ), many=True,
+        ).data
+
+    @pytest.mark.django_db
+    def test_05_title_page(self, page):
+        assert FastJSONRenderer().render(page) == JSONRenderer().render(page)
+
+    @pytest.mark.benchmark
+    @pytest.mark.django_db
+    def test_06_benchmark(self, page, record_property):
+        timings = {}
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            timings[type(renderer).__name__] = min(timeit.repeat(
+                lambda: renderer.render(page), number=20, repeat=5
+            )) / 20 * 1000
+        for name, milliseconds in timings.items():
+            record_property(f'{name}_ms_per_page', round(milliseconds, 3))
+        assert timings['FastJSONRenderer'] < timings['JSONRenderer'], (
+            'Проверьте, что FastJSONRenderer быстрее JSONRenderer.'
+        )
@@ -0,0 +1,147 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+
+from api import packing
+from api.packing import MAX_DEPTH, PackError, packb, unpack, unpackb
+from api.renderers import MessagePackRenderer
+from tests.utils import create_titles
+
+MSGPACK = 'application/x-msgpack'
+COLUMNS = f'{MSGPACK}; layout=columns'
+
+
+class Test25MessagePackCodec:
+
+    def test_01_encoding(self):
+        assert packb({'a': 1}) == b'\x81\xa1a\x01'
+        assert packb([None, True, False]) == b'\x93\xc0\xc3\xc2'
+        assert packb(-1) == b'\xff'
+        assert packb(-33) == b'\xd0\xdf'
+        assert packb(300) == b'\xcd\x01\x2c'
+        assert packb(2 ** 40) == b'\xcf\x00\x00\x01\x00\x00\x00\x00\x00'
+        assert packb(1.5) == b'\xcb\x3f\xf8' + b'\x00' * 6
+        assert packb('я' * 20) == b'\xd9\x28' + 'я'.encode() * 20
+        assert packb(list(range(16)))[:3] == b'\xdc\x00\x10'
+        with pytest.raises(PackError):
+            packb(2 ** 64)
+        with pytest.raises(PackError):
+            packb(object())
+
+    def test_02_round_trip(self):
+        value = {
+            'id': 1, 'name': 'Терминатор', 'rating': None, 'score': -7,
+            'big': -2 ** 63, 'ratio': 0.25, 'blob': b'\x00\xff',
+            'genre': [{'name': 'Ужасы' * 100, 'slug': 'horror'}] * 20,
+            'text': 'x' * 70000,
+        }
+        assert unpackb(packb(value)) == value
+        assert unpack(packb(value)) == value
+        for broken in (b'\x92\x01', b'\xc1', b'\x01\x02', b'\xa2\xff\xfe'):
+            with pytest.raises(PackError):
+                unpackb(broken)
+
+    def test_03_depth_limit(self):
+        assert unpackb(b'\x91' * MAX_DEPTH + b'\xc0') is not None
+        deep = b'\x91' * 50000 + b'\xc0'
+        with pytest.raises(PackError):
+            unpackb(deep)
+        with pytest.raises(PackError):
+            unpackb(b'\x81\xa1a' * (MAX_DEPTH + 1) + b'\xc0')
+        with pytest.raises(PackError):
+            unpack(deep)
+
+    def test_04_renderer(self):
+        renderer = MessagePackRenderer()
+        data = {
+            'pub_date': datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            'price': Decimal('1.50'),
+        }
+        assert unpackb(renderer.render(data)) == {
+            'pub_date': '2020-01-02T03:04:05Z', 'price': 1.5,
+        }
+        rows = [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]
+        assert unpackb(renderer.render(rows, COLUMNS)) == {
+            'columns': ['id', 'name'], 'rows': [[1, 'a'], [2, 'b']],
+        }
+        mixed = [{'id': 1}, {'name': 'b'}]
+        assert unpackb(renderer.render(mixed, COLUMNS)) == mixed
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25MessagePackAPI:
+
+    def test_01_negotiation(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        expected = client.get(url).json()
+        response = client.get(url, HTTP_ACCEPT=MSGPACK)
+        assert response['Content-Type'] == MSGPACK
+        assert unpackb(response.content) == expected
+        assert len(response.content) < len(client.get(url).content)
+        assert unpackb(client.get(f'{url}?format=msgpack').content) == (
+            expected
+        )
+
+        response = client.get(url, HTTP_ACCEPT=COLUMNS)
+        page = unpackb(response.content)
+        results = page.pop('results')
+        assert page == {
+            key: value for key, value in expected.items() if key != 'results'
+        }
+        assert [
+            dict(zip(results['columns'], row)) for row in results['rows']
+        ] == expected['results'], (
+            'Проверьте, что layout=columns передаёт те же строки по столбцам.'
+        )
+        detail = client.get(f'{url}{titles[0]["id"]}/', HTTP_ACCEPT=COLUMNS)
+        assert unpackb(detail.content)['id'] == titles[0]['id']
+
+    def test_02_cache_per_layout(self, client, admin_client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        rows = client.get(url, HTTP_ACCEPT=MSGPACK)
+        columns = client.get(url, HTTP_ACCEPT=COLUMNS)
+        assert columns['X-Cache'] == 'MISS'
+        assert columns['ETag'] != rows['ETag']
+        assert columns.content != rows.content
+
+    def test_03_parser(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/',
+            data=packb({'name': 'Фильм', 'slug': 'films'}),
+            content_type=MSGPACK,
+        )
+        assert response.status_code == 201, response.content
+        response = admin_client.post(
+            '/api/v1/categories/', data=b'\x82\xa4name',
+            content_type=MSGPACK,
+        )
+        assert response.status_code == 400
+        for library in (packing.msgpack, None):
+            with mock.patch.object(packing, 'msgpack', library):
+                response = admin_client.post(
+                    '/api/v1/categories/', data=b'\x91' * 50000 + b'\xc0',
+                    content_type=MSGPACK,
+                )
+            assert response.status_code == 400, (
+                'Проверьте, что слишком глубокая вложенность MessagePack '
+                'возвращает 400.'
+            )
+
+    def test_04_accept_params(self, client, admin_client):
+        create_titles(admin_client)
+        url = '/api/v1/categories/'
+        for accept in (f'{MSGPACK}; layout=é', 'application/json; indent=é'):
+            assert client.get(url, HTTP_ACCEPT=accept).status_code == 200, (
+                'Проверьте, что параметры Accept не в ASCII не ломают ответ.'
+            )
+        first = client.get(url, HTTP_ACCEPT=f'{MSGPACK}; x=1')
+        second = client.get(url, HTTP_ACCEPT=f'{MSGPACK}; x=2')
+        assert second['X-Cache'] == 'HIT', (
+            'Проверьте, что посторонние параметры Accept не создают '
+            'новых записей кэша.'
+        )
+        assert second['ETag'] == first['ETag']
@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26SparseFields:
+
+    @pytest.mark.parametrize('fast', (True, False))
+    def test_01_titles(self, client, admin_client, settings, fast):
+        settings.FAST_READ_SERIALIZERS = fast
+        settings.RESPONSE_CACHE = ''
+        titles, _, _ = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        assert response.status_code == 200
+        for title in response.json()['results']:
+            assert list(title) == ['id', 'name', 'rating'], (
+                'Проверьте, что `?fields=` оставляет только перечисленные '
+                'поля в исходном порядке.'
+            )
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'reviews_genre' not in sql, (
+            'Проверьте, что жанры не запрашиваются, если они не нужны.'
+        )
+        assert 'reviews_category' not in sql
+        assert '"description"' not in sql
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/?omit=description,genre'
+        data = client.get(url).json()
+        assert list(data) == ['id', 'name', 'year', 'category', 'rating']
+        assert data['category']['slug'] == titles[0]['category']
+
+    @pytest.mark.parametrize('fast', (True, False))
+    def test_02_reviews(self, client, admin_client, user_client, settings,
+                        fast):
+        settings.FAST_READ_SERIALIZERS = fast
+        settings.RESPONSE_CACHE = ''
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?fields=id,score'
+        with CaptureQueriesContext(connection) as context:
+            data = client.get(url).json()
+        assert [list(review) for review in data['results']] == [
+            ['id', 'score']
+        ]
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'reviews_user' not in sql
+        assert '"text"' not in sql
+
+    def test_03_other_endpoints(self, client, admin_client):
+        create_titles(admin_client)
+        data = client.get('/api/v1/categories/?fields=slug,unknown').json()
+        assert all(list(item) == ['slug'] for item in data['results'])
+        data = client.get('/api/v1/genres/?omit=slug').json()
+        assert all(list(item) == ['name'] for item in data['results'])
+        data = admin_client.get('/api/v1/users/?fields=username').json()
+        assert all(list(item) == ['username'] for item in data['results'])
+
+    def test_04_writes_unchanged(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/?fields=slug',
+            data={'name': 'Фильм', 'slug': 'films'},
+        )
+        assert response.status_code == 201
+        assert response.json() == {'name': 'Фильм', 'slug': 'films'}, (
+            'Проверьте, что `?fields=` не влияет на запросы записи.'
+        )
+
+    def test_05_etag(self, client, admin_client):
+        create_titles(admin_client)
+        full = client.get('/api/v1/titles/')
+        sparse = client.get('/api/v1/titles/?fields=id')
+        assert sparse['ETag'] != full['ETag']
+        assert sparse.content != full.content
@@ -0,0 +1,79 @@
+import gzip
+from unittest import mock
+
+import pytest
+
+from api import compression
+from api.compression import choose_encoding
+from reviews.synthetic import Dataset
+
+URL = '/api/v1/titles/?page_size=100'
+
+
+class Test27Negotiation:
+
+    def test_01_choose_encoding(self):
+        encodings = ('br', 'gzip')
+        assert choose_encoding('gzip, deflate, br', encodings) == 'br'
+        assert choose_encoding('gzip;q=1, br;q=0.5', encodings) == 'gzip'
+        assert choose_encoding('br;q=0, *', encodings) == 'gzip'
+        assert choose_encoding('identity', encodings) is None
+        assert choose_encoding('', encodings) is None
+        assert choose_encoding(None, encodings) is None
+        assert choose_encoding('gzip;q=abc', encodings) is None
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Compression:
+
+    @pytest.fixture(autouse=True)
+    def titles(self):
+        Dataset(titles=60, users=5, reviews=0, comments=0).save()
+
+    def test_01_gzip(self, client):
+        plain = client.get(URL)
+        assert 'Content-Encoding' not in plain
+        response = client.get(URL, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что большие ответы сжимаются при Accept-Encoding.'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        assert gzip.decompress(response.content) == plain.content
+        assert int(response['Content-Length']) < len(plain.content)
+        assert response['ETag'] == f'W/{plain["ETag"]}'
+
+        revalidated = client.get(
+            URL, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        assert revalidated.status_code == 304
+
+    def test_02_small_and_refused(self, client):
+        response = client.get(
+            '/api/v1/categories/?page_size=1', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert 'Content-Encoding' not in response, (
+            'Проверьте, что ответы меньше COMPRESSION_MIN_SIZE не сжимаются.'
+        )
+        response = client.get(URL, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        assert 'Content-Encoding' not in response
+
+    def test_03_cached_variants(self, client):
+        compress = mock.Mock(wraps=compression.compress_gzip)
+        with mock.patch.dict(compression.CODECS, {'gzip': compress}):
+            first = client.get(URL, HTTP_ACCEPT_ENCODING='gzip')
+            second = client.get(URL, HTTP_ACCEPT_ENCODING='gzip')
+            third = client.get(URL)
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT'
+        assert second.content == first.content
+        assert second['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(second.content) == third.content
+        assert compress.call_count == 1, (
+            'Проверьте, что ответ из кэша не сжимается повторно.'
+        )
+
+    def test_04_disabled(self, client, settings):
+        settings.COMPRESSION_MIN_SIZE = 10 ** 9
+        response = client.get(URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert 'Content-Encoding' not in response
@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +308,18 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def check_query_budget(client, url, budget):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    queries = '\n'.join(query['sql'] for query in context.captured_queries)
+    assert len(context) <= budget, (
+        f'GET-запрос к `{url}` выполняет {len(context)} SQL-запросов, '
+        f'допустимо не больше {budget}:\n{queries}'
+    )
+    return response